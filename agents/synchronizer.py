@@ -7,18 +7,28 @@ Agent ID Format: SYNC-{VARIANT}-{SERIAL}
 Example: SYNC-AETHRA-0027
 """
 
+import os
 import time
 import json
+import mmap
+import bisect
+import struct
 import hashlib
 import asyncio
 import logging
 import threading
-from typing import Dict, List, Any, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Any, Optional, Set, Tuple
 from collections import Counter, defaultdict, deque
 from dataclasses import dataclass, asdict
+from functools import lru_cache
 from enum import Enum
 from datetime import datetime, timedelta
 import uuid
+import operator
+import contextvars
+from array import array
+from itertools import repeat
+import random
 import hmac
 import base64
 from concurrent.futures import ThreadPoolExecutor
@@ -38,50 +48,156 @@ class AgentStatus(Enum):
     RECOVERING = "RECOVERING"
 
 
-@dataclass
+class NodeIndex:
+    """Interns node ids to dense indices shared by every VectorClock in the process"""
+    
+    def __init__(self):
+        self.indices: Dict[str, int] = {}
+        self.names: List[str] = []
+    
+    def intern(self, node_id: str) -> int:
+        index = self.indices.get(node_id)
+        if index is None:
+            index = self.indices[node_id] = len(self.names)
+            self.names.append(node_id)
+        return index
+
+
+NODE_INDEX = NodeIndex()
+
+
 class VectorClock:
-    """Logical clock for distributed synchronization"""
-    clocks: Dict[str, int]
+    """
+    Logical clock for distributed synchronization
     
-    def __post_init__(self):
-        if not self.clocks:
-            self.clocks = {}
+    Counters live in an array indexed by interned node ids; absent and
+    zero entries are equivalent. Every change is appended to a change log,
+    so wire deltas and comparisons against a peer only visit the entries
+    changed since a log position. The log keeps roughly the last
+    2 * len(counters) changes; older positions report None and callers
+    fall back to the full clock.
+    """
+    
+    __slots__ = ('counters', 'log', 'log_base')
+    
+    def __init__(self, clocks: Optional[Dict[str, int]] = None):
+        self.counters = array('q')
+        self.log: List[int] = []
+        self.log_base = 0
+        if clocks:
+            indices = [NODE_INDEX.intern(node_id) for node_id in clocks]
+            self.counters = array('q', bytes(8 * (max(indices) + 1)))
+            for index, value in zip(indices, clocks.values()):
+                self.counters[index] = value
+            self.log = indices
+    
+    @property
+    def clocks(self) -> Dict[str, int]:
+        names = NODE_INDEX.names
+        return {names[i]: value for i, value in enumerate(self.counters) if value}
+    
+    @property
+    def position(self) -> int:
+        """Change log position after the latest change"""
+        return self.log_base + len(self.log)
+    
+    def value(self, index: int) -> int:
+        return self.counters[index] if index < len(self.counters) else 0
+    
+    def get(self, node_id: str) -> int:
+        index = NODE_INDEX.indices.get(node_id)
+        return 0 if index is None else self.value(index)
+    
+    def _set(self, index: int, value: int) -> None:
+        counters = self.counters
+        if index >= len(counters):
+            counters.extend(repeat(0, index + 1 - len(counters)))
+        counters[index] = value
+        
+        self.log.append(index)
+        if len(self.log) > 2 * len(counters) + 64:
+            drop = len(self.log) // 2
+            del self.log[:drop]
+            self.log_base += drop
+    
+    def changed_since(self, position: int) -> Optional[Set[int]]:
+        """Indices changed after `position`, or None if the log no longer reaches back"""
+        if position < self.log_base:
+            return None
+        return set(self.log[position - self.log_base:])
+    
+    def delta_since(self, position: int) -> Optional[Dict[str, int]]:
+        """Entries changed after `position` by node id (None: send the full clock)"""
+        changed = self.changed_since(position)
+        if changed is None:
+            return None
+        names = NODE_INDEX.names
+        return {names[i]: self.counters[i] for i in changed}
     
     def tick(self, node_id: str) -> None:
         """Increment local clock"""
-        self.clocks[node_id] = self.clocks.get(node_id, 0) + 1
+        index = NODE_INDEX.intern(node_id)
+        self._set(index, self.value(index) + 1)
     
-    def update(self, other: 'VectorClock') -> None:
-        """Update with another vector clock"""
-        for node_id, clock_val in other.clocks.items():
-            self.clocks[node_id] = max(self.clocks.get(node_id, 0), clock_val)
+    def update(self, other: 'VectorClock', since: Optional[int] = None) -> int:
+        """
+        Update with another vector clock
+        
+        With `since`, only the other clock's entries changed after that
+        log position are merged (O(changed)); a clock decoded from a delta
+        holds exactly its entries after position 0. Returns the number of
+        entries that advanced.
+        """
+        indices = other.changed_since(since) if since is not None else None
+        if indices is None:
+            indices = range(len(other.counters))
+        
+        advanced = 0
+        theirs = other.counters
+        for i in indices:
+            if theirs[i] > self.value(i):
+                self._set(i, theirs[i])
+                advanced += 1
+        return advanced
+    
+    def _aligned(self, other: 'VectorClock') -> Tuple[array, array]:
+        mine, theirs = self.counters, other.counters
+        if len(mine) < len(theirs):
+            mine = mine + array('q', bytes(8 * (len(theirs) - len(mine))))
+        elif len(theirs) < len(mine):
+            theirs = theirs + array('q', bytes(8 * (len(mine) - len(theirs))))
+        return mine, theirs
     
     def compare(self, other: 'VectorClock') -> str:
         """Compare two vector clocks"""
-        self_keys = set(self.clocks.keys())
-        other_keys = set(other.clocks.keys())
-        all_keys = self_keys | other_keys
-        
-        self_greater = False
-        other_greater = False
-        
-        for key in all_keys:
-            self_val = self.clocks.get(key, 0)
-            other_val = other.clocks.get(key, 0)
-            
-            if self_val > other_val:
-                self_greater = True
-            elif other_val > self_val:
-                other_greater = True
-        
-        if self_greater and not other_greater:
+        mine, theirs = self._aligned(other)
+        if mine == theirs:
+            return "concurrent"
+        if all(map(operator.ge, mine, theirs)):
             return "after"
-        elif other_greater and not self_greater:
+        if all(map(operator.le, mine, theirs)):
             return "before"
-        elif not self_greater and not other_greater:
-            return "concurrent"
-        else:
-            return "concurrent"
+        return "concurrent"
+    
+    def max_difference(self, other: 'VectorClock') -> int:
+        """Largest absolute per-node difference"""
+        mine, theirs = self._aligned(other)
+        return max(map(abs, map(operator.sub, mine, theirs)), default=0)
+    
+    def copy(self) -> 'VectorClock':
+        clock = VectorClock()
+        clock.counters = array('q', self.counters)
+        return clock
+    
+    def to_dict(self) -> Dict:
+        return {'clocks': self.clocks}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'VectorClock':
+        return cls(data.get('clocks'))
+    
+    def __repr__(self) -> str:
+        return f"VectorClock({self.clocks!r})"
 
 
 @dataclass
@@ -94,32 +210,158 @@ class SyncBeat:
     state_hash: str
     signature: str
     sequence_number: int
+    clock_delta: bool = False  # vector_clock only holds entries changed since the last beat
     
     def to_dict(self) -> Dict:
         return {
             'timestamp': self.timestamp,
             'agent_id': self.agent_id,
             'status': self.status.value,
-            'vector_clock': asdict(self.vector_clock),
+            'vector_clock': self.vector_clock.to_dict(),
+            'clock_delta': self.clock_delta,
             'state_hash': self.state_hash,
             'signature': self.signature,
             'sequence_number': self.sequence_number
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SyncBeat':
+        return cls(
+            timestamp=data['timestamp'],
+            agent_id=data['agent_id'],
+            status=AgentStatus(data['status']),
+            vector_clock=VectorClock.from_dict(data['vector_clock']),
+            state_hash=data['state_hash'],
+            signature=data['signature'],
+            sequence_number=data['sequence_number'],
+            clock_delta=data.get('clock_delta', False)
+        )
+
+
+# Additive multiset hashes are sums of per-entry hashes modulo 2**256
+MULTISET_MODULUS = 1 << 256
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+_MISSING = object()
+_CANONICAL_JSON = json.JSONEncoder(sort_keys=True)
+_CACHED_STR_LEN = 64      # longer strings are encoded every time
+_CACHED_INT_BITS = 64     # as are ints outside +/-2**64
+
+
+@lru_cache(maxsize=65536, typed=True)
+def _scalar_encoding(value: Any) -> bytes:
+    return _CANONICAL_JSON.encode(value).encode()
+
+
+def canonical_encoding(value: Any) -> bytes:
+    """
+    Sorted-key JSON encoding of one state value
+    
+    Small scalar encodings are memoised (typed, so 1, 1.0 and True stay
+    distinct); container digests are cached per snapshot instead. A
+    scalar -0.0 encodes as 0.0: the two compare equal and share a cache
+    key, so they must share an encoding.
+    """
+    kind = type(value)
+    if kind is float:
+        return _scalar_encoding(value + 0.0)  # -0.0 + 0.0 == 0.0
+    if kind is str:
+        if len(value) <= _CACHED_STR_LEN:
+            return _scalar_encoding(value)
+    elif kind is int:
+        if value.bit_length() <= _CACHED_INT_BITS:
+            return _scalar_encoding(value)
+    elif kind in _SCALAR_TYPES:
+        return _scalar_encoding(value)
+    return _CANONICAL_JSON.encode(value).encode()
+
+
+def entry_digest(key: str, value: Any) -> str:
+    """Digest of one key and its value; also its element of the multiset hash"""
+    content = key.encode() + b'\x1f' + canonical_encoding(value)
+    return hashlib.blake2b(content, digest_size=32).hexdigest()
+
+
+def multiset_hash(digests: Iterable[str]) -> int:
+    """Order-independent hash of a collection of entry digests"""
+    return sum(int(digest, 16) for digest in digests) % MULTISET_MODULUS
 
 
 @dataclass
 class StateSnapshot:
-    """Node state snapshot"""
+    """
+    Node state snapshot
+    
+    The checksum is an additive multiset hash of per-key entry digests, so
+    a snapshot derived from an older one of the same node only hashes the
+    keys that changed. Digests are cached on the snapshot, which means
+    `data` must not be mutated once a checksum has been computed.
+    """
     node_id: str
     timestamp: float
     data: Dict[str, Any]
     version: int
     checksum: str
     
+    def __post_init__(self):
+        # Caches, deliberately not dataclass fields so asdict() stays lean
+        self._digests: Optional[Dict[str, str]] = None
+        self._state_sum: Optional[int] = None
+    
+    def key_digests(self) -> Dict[str, str]:
+        """Per-key entry digests, computed once per snapshot"""
+        if self._digests is None:
+            self._digests = {key: entry_digest(key, value) for key, value in self.data.items()}
+        return self._digests
+    
     def compute_checksum(self) -> str:
         """Compute state checksum"""
-        data_str = json.dumps(self.data, sort_keys=True)
-        return hashlib.sha256(data_str.encode()).hexdigest()
+        self._state_sum = multiset_hash(self.key_digests().values())
+        return f"{self._state_sum:064x}"
+    
+    def derive_checksum(self, previous: Optional['StateSnapshot'] = None) -> List[str]:
+        """
+        Set digests and checksum from an older snapshot of the same node
+        
+        Values identical to the previous snapshot's (the same object, or an
+        equal scalar of the same type) reuse its digests; everything else is
+        re-digested, since == equates 1, 1.0 and True inside containers
+        while their encodings differ. The multiset hash is adjusted by the
+        old and new entries of changed keys only. Returns the added,
+        changed and removed keys.
+        """
+        if previous is None or previous._state_sum is None:
+            self.checksum = self.compute_checksum()
+            return list(self._digests)
+        
+        old_data = previous.data
+        old_digests = previous._digests
+        total = previous._state_sum
+        digests = {}
+        changed = []
+        
+        for key, value in self.data.items():
+            old = old_data.get(key, _MISSING)
+            if old is value or (type(old) is type(value) and type(value) in _SCALAR_TYPES and old == value):
+                digests[key] = old_digests[key]
+                continue
+            digest = entry_digest(key, value)
+            digests[key] = digest
+            old_digest = old_digests.get(key)
+            if old_digest == digest:
+                continue
+            if old_digest is not None:
+                total -= int(old_digest, 16)
+            total += int(digest, 16)
+            changed.append(key)
+        
+        for key in old_digests.keys() - digests.keys():
+            total -= int(old_digests[key], 16)
+            changed.append(key)
+        
+        self._digests = digests
+        self._state_sum = total % MULTISET_MODULUS
+        self.checksum = f"{self._state_sum:064x}"
+        return changed
 
 
 @dataclass
@@ -131,41 +373,168 @@ class CommitEntry:
     affected_nodes: List[str]
     vector_clock: VectorClock
     rollback_data: Optional[Dict] = None
+    
+    def to_dict(self) -> Dict:
+        """Serialize to dictionary"""
+        return {
+            'timestamp': self.timestamp,
+            'operation': self.operation,
+            'state_hash': self.state_hash,
+            'affected_nodes': self.affected_nodes,
+            'vector_clock': self.vector_clock.clocks,
+            'rollback_data': self.rollback_data
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CommitEntry':
+        """Deserialize from dictionary"""
+        return cls(
+            timestamp=data['timestamp'],
+            operation=data['operation'],
+            state_hash=data['state_hash'],
+            affected_nodes=data['affected_nodes'],
+            vector_clock=VectorClock(data['vector_clock']),
+            rollback_data=data.get('rollback_data')
+        )
+
+
+class PeerClock:
+    """
+    Last known clock of one peer and its difference from the local clock
+    
+    `diffs` holds local - peer for the entries that differ; the log
+    positions record how far both clocks had been compared.
+    """
+    
+    __slots__ = ('clock', 'clock_position', 'local_position', 'diffs', 'ahead', 'behind')
+    
+    def __init__(self):
+        self.clock = VectorClock()
+        self.clock_position = 0
+        self.local_position = -1  # forces a full first comparison
+        self.diffs: Dict[int, int] = {}
+        self.ahead = 0
+        self.behind = 0
 
 
 class ClockSyncer:
-    """Aligns time ticks using Vector clocks"""
+    """
+    Aligns time ticks using Vector clocks
     
-    def __init__(self, node_id: str):
+    Heartbeats carry only the entries changed since the previous beat, with
+    the full clock every `full_clock_interval` beats so lost deltas heal.
+    Peers' clocks are mirrored from their beats, and comparing against a
+    peer only revisits entries changed on either side since the last
+    comparison.
+    """
+    
+    def __init__(self, node_id: str, full_clock_interval: int = 30):
         self.node_id = node_id
         self.vector_clock = VectorClock({node_id: 0})
         self.drift_threshold = 5.0  # seconds
+        self.full_clock_interval = full_clock_interval
+        self.beats_since_full = full_clock_interval  # first beat is full
+        self.delta_position = 0
+        self.peers: Dict[str, PeerClock] = {}
     
     def tick(self) -> VectorClock:
         """Increment local clock and return current state"""
         self.vector_clock.tick(self.node_id)
-        return VectorClock(self.vector_clock.clocks.copy())
+        return self.vector_clock.copy()
+    
+    def beat_clock(self) -> Tuple[VectorClock, bool]:
+        """
+        Tick and return the clock to put on the next heartbeat
+        
+        Returns (clock, is_delta); a delta clock holds only the entries
+        changed since the previous beat.
+        """
+        self.vector_clock.tick(self.node_id)
+        delta = self.vector_clock.delta_since(self.delta_position)
+        self.delta_position = self.vector_clock.position
+        self.beats_since_full += 1
+        
+        if delta is None or self.beats_since_full >= self.full_clock_interval:
+            self.beats_since_full = 0
+            return self.vector_clock.copy(), False
+        return VectorClock(delta), True
     
-    def sync_with_peer(self, peer_clock: VectorClock) -> None:
-        """Synchronize with peer's vector clock"""
-        self.vector_clock.update(peer_clock)
+    def sync_with_peer(self, peer_clock: VectorClock, peer_id: Optional[str] = None,
+                       delta: bool = False) -> Optional[str]:
+        """
+        Synchronize with peer's vector clock
+        
+        With a `peer_id` the peer's mirror is updated first and the merge is
+        skipped when the local clock already dominates; returns the order
+        of the local clock relative to the peer's before merging.
+        """
+        since = 0 if delta else None
+        order = None
+        if peer_id is not None:
+            peer = self.peers.get(peer_id)
+            if peer is None:
+                peer = self.peers[peer_id] = PeerClock()
+            peer.clock.update(peer_clock, since)
+            order = self.compare_with_peer(peer_id)
+        
+        if order != "after":
+            self.vector_clock.update(peer_clock, since)
         self.vector_clock.tick(self.node_id)
+        return order
+    
+    def compare_with_peer(self, peer_id: str) -> str:
+        """
+        Compare the local clock with a peer's last known clock
+        
+        Costs O(entries changed on either side since the last comparison);
+        when that is more than a quarter of the clock the differences are
+        rebuilt in one array pass instead.
+        """
+        peer = self.peers[peer_id]
+        local = self.vector_clock
+        
+        local_changes = local.changed_since(peer.local_position)
+        peer_changes = peer.clock.changed_since(peer.clock_position)
+        indices = None
+        if local_changes is not None and peer_changes is not None:
+            indices = local_changes | peer_changes
+        
+        if indices is None or 4 * len(indices) > len(local.counters):
+            mine, theirs = local._aligned(peer.clock)
+            peer.diffs = {i: diff for i, diff in enumerate(map(operator.sub, mine, theirs)) if diff}
+            peer.ahead = sum(map((0).__lt__, peer.diffs.values()))
+            peer.behind = len(peer.diffs) - peer.ahead
+        else:
+            diffs = peer.diffs
+            for i in indices:
+                old = diffs.pop(i, 0)
+                if old > 0:
+                    peer.ahead -= 1
+                elif old < 0:
+                    peer.behind -= 1
+                
+                diff = local.value(i) - peer.clock.value(i)
+                if diff > 0:
+                    diffs[i] = diff
+                    peer.ahead += 1
+                elif diff < 0:
+                    diffs[i] = diff
+                    peer.behind += 1
+        
+        peer.local_position = local.position
+        peer.clock_position = peer.clock.position
+        
+        if peer.ahead and not peer.behind:
+            return "after"
+        if peer.behind and not peer.ahead:
+            return "before"
+        return "concurrent"
     
     def detect_drift(self, peer_clocks: List[VectorClock]) -> bool:
         """Detect if clocks have drifted significantly"""
-        current_time = time.time()
-        
-        for peer_clock in peer_clocks:
-            # Simple drift detection based on logical clock differences
-            max_diff = max(abs(self.vector_clock.clocks.get(node, 0) - 
-                             peer_clock.clocks.get(node, 0))
-                          for node in set(self.vector_clock.clocks.keys()) | 
-                          set(peer_clock.clocks.keys()))
-            
-            if max_diff > self.drift_threshold:
-                return True
-        
-        return False
+        # Simple drift detection based on logical clock differences
+        return any(self.vector_clock.max_difference(peer_clock) > self.drift_threshold
+                   for peer_clock in peer_clocks)
 
 
 class StateDiffer:
@@ -175,55 +544,63 @@ class StateDiffer:
         self.conflict_resolver = "majority_wins"
     
     def compute_state_hash(self, state: Dict[str, Any]) -> str:
-        """Compute deterministic hash of state"""
-        state_str = json.dumps(state, sort_keys=True)
-        return hashlib.sha256(state_str.encode()).hexdigest()
+        """Compute deterministic hash of state (same scheme as StateSnapshot checksums)"""
+        state_sum = multiset_hash(entry_digest(key, value) for key, value in state.items())
+        return f"{state_sum:064x}"
     
     def find_differences(self, state1: StateSnapshot, state2: StateSnapshot) -> Dict[str, Any]:
         """Find differences between two states"""
         diff = {}
+        digests1 = state1.key_digests()
+        digests2 = state2.key_digests()
         
         # Find keys that differ
-        all_keys = set(state1.data.keys()) | set(state2.data.keys())
+        all_keys = digests1.keys() | digests2.keys()
         
         for key in all_keys:
-            val1 = state1.data.get(key)
-            val2 = state2.data.get(key)
-            
-            if val1 != val2:
+            if digests1.get(key) != digests2.get(key):
                 diff[key] = {
-                    'state1': val1,
-                    'state2': val2,
+                    'state1': state1.data.get(key),
+                    'state2': state2.data.get(key),
                     'conflict': True
                 }
         
         return diff
     
     def resolve_conflicts(self, snapshots: List[StateSnapshot]) -> StateSnapshot:
-        """Resolve conflicts using majority consensus"""
+        """
+        Resolve conflicts using majority consensus
+        
+        Votes are cast with the snapshots' cached entry digests; ties go to
+        the value seen first. Resolved values are shared with the winning
+        snapshot rather than copied.
+        """
         if not snapshots:
             raise ValueError("No snapshots to resolve")
         
         if len(snapshots) == 1:
             return snapshots[0]
         
+        digest_maps = [snapshot.key_digests() for snapshot in snapshots]
+        
         # Find most common state for each key
         all_keys = set()
-        for snapshot in snapshots:
-            all_keys.update(snapshot.data.keys())
+        for digests in digest_maps:
+            all_keys.update(digests)
         
         resolved_data = {}
+        resolved_digests = {}
         
         for key in all_keys:
-            values = []
-            for snapshot in snapshots:
-                if key in snapshot.data:
-                    values.append(json.dumps(snapshot.data[key], sort_keys=True))
+            votes = Counter(digests[key] for digests in digest_maps if key in digests)
             
-            if values:
-                # Use majority vote
-                most_common = Counter(values).most_common(1)[0][0]
-                resolved_data[key] = json.loads(most_common)
+            # Use majority vote
+            winner = votes.most_common(1)[0][0]
+            for snapshot, digests in zip(snapshots, digest_maps):
+                if digests.get(key) == winner:
+                    resolved_data[key] = snapshot.data[key]
+                    break
+            resolved_digests[key] = winner
         
         # Create new resolved snapshot
         resolved_snapshot = StateSnapshot(
@@ -233,19 +610,177 @@ class StateDiffer:
             version=max(s.version for s in snapshots) + 1,
             checksum=""
         )
+        resolved_snapshot._digests = resolved_digests
         resolved_snapshot.checksum = resolved_snapshot.compute_checksum()
         
         return resolved_snapshot
 
 
+def merkle_key(node_id: str, key: str) -> str:
+    """Tree key for one key of one node's snapshot"""
+    return f"{node_id}\x1f{key}"
+
+
+class MerkleTree:
+    """
+    Fixed-shape Merkle tree over snapshot keys for anti-entropy
+    
+    Keys are spread over fanout**depth leaf buckets by a hash of the key,
+    so trees of the same shape on different agents cover identical key
+    ranges and can be compared level by level. A leaf hash covers the
+    sorted (key, value digest) pairs of its bucket and an interior hash
+    covers its children's hashes. set()/delete() only mark buckets dirty;
+    hashes are recomputed for the dirty paths when next read.
+    """
+    
+    def __init__(self, fanout: int = 16, depth: int = 3):
+        self.fanout = fanout
+        self.depth = depth
+        self.leaf_count = fanout ** depth
+        self.buckets: List[Dict[str, str]] = [{} for _ in range(self.leaf_count)]
+        empty = self._hash(b'')
+        # levels[0] is the root, levels[depth] are the leaf buckets
+        self.levels: List[List[str]] = [[empty] * (fanout ** level) for level in range(depth + 1)]
+        self.dirty: Set[int] = set(range(self.leaf_count))
+        self.size = 0
+    
+    @staticmethod
+    def _hash(content: bytes) -> str:
+        # 128-bit node hashes keep the per-level exchange small
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+    
+    def bucket_of(self, key: str) -> int:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') % self.leaf_count
+    
+    def set(self, key: str, digest: str) -> None:
+        index = self.bucket_of(key)
+        bucket = self.buckets[index]
+        if bucket.get(key) != digest:
+            self.size += key not in bucket
+            bucket[key] = digest
+            self.dirty.add(index)
+    
+    def delete(self, key: str) -> None:
+        index = self.bucket_of(key)
+        if self.buckets[index].pop(key, None) is not None:
+            self.size -= 1
+            self.dirty.add(index)
+    
+    def _refresh(self) -> None:
+        if not self.dirty:
+            return
+        
+        leaves = self.levels[self.depth]
+        for index in self.dirty:
+            bucket = self.buckets[index]
+            content = ''.join(f"{key}\0{bucket[key]}\n" for key in sorted(bucket))
+            leaves[index] = self._hash(content.encode())
+        
+        changed = self.dirty
+        for level in range(self.depth - 1, -1, -1):
+            changed = {index // self.fanout for index in changed}
+            children = self.levels[level + 1]
+            for index in changed:
+                start = index * self.fanout
+                self.levels[level][index] = self._hash(''.join(children[start:start + self.fanout]).encode())
+        self.dirty = set()
+    
+    def root(self) -> str:
+        self._refresh()
+        return self.levels[0][0]
+    
+    def child_hashes(self, level: int, indices: List[int]) -> Dict[int, str]:
+        """Hashes at level + 1 of the children of the given nodes at `level`"""
+        self._refresh()
+        children = self.levels[level + 1]
+        return {
+            child: children[child]
+            for index in indices
+            for child in range(index * self.fanout, (index + 1) * self.fanout)
+        }
+    
+    def diverging(self, level: int, remote_hashes: Dict[int, str]) -> List[int]:
+        """Indices at `level` whose remote hash differs from ours"""
+        self._refresh()
+        local = self.levels[level]
+        return sorted(int(index) for index, digest in remote_hashes.items() if local[int(index)] != digest)
+    
+    def keys_in(self, buckets: List[int]) -> List[str]:
+        return [key for index in buckets for key in self.buckets[index]]
+
+
+# Set while one of an agent's protocol handlers runs; replies sent from a
+# handler skip backpressure so the consumer can always make progress
+_HANDLING_PROTOCOL: contextvars.ContextVar = contextvars.ContextVar('handling_protocol', default=None)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (seconds)"""
+    
+    BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+    
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile"""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.BOUNDS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+    
+    def summary(self) -> Dict[str, Any]:
+        buckets = {f"le_{bound * 1000:g}ms": count for bound, count in zip(self.BOUNDS, self.counts)}
+        buckets['le_inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p95_ms': round(self.percentile(95) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+            'buckets': buckets
+        }
+
+
 class BroadcastChannel:
-    """Pushes updates across agent subsystems"""
+    """
+    Pushes updates across agent subsystems
     
-    def __init__(self, agent_id: str):
+    Broadcasts run subscriber callbacks concurrently, at most `max_fanout`
+    at a time. Targeted messages queue until the agent has finished
+    handling them; once `high_watermark` are outstanding, senders wait
+    until the backlog falls to half of it (replies sent from inside a
+    protocol handler are exempt).
+    """
+    
+    def __init__(self, agent_id: str, max_fanout: int = 16, high_watermark: int = 1000):
         self.agent_id = agent_id
         self.subscribers = defaultdict(list)
         self.message_queue = asyncio.Queue()
         self.broadcast_history = deque(maxlen=1000)
+        self.max_fanout = max(1, max_fanout)
+        self.high_watermark = high_watermark
+        self.low_watermark = high_watermark // 2
+        self.pending = 0
+        self.below_watermark = asyncio.Event()
+        self.below_watermark.set()
+        self.backpressure_waits = 0
     
     def subscribe(self, protocol_tag: str, callback) -> None:
         """Subscribe to specific protocol messages"""
@@ -264,16 +799,29 @@ class BroadcastChannel:
         # Store in history
         self.broadcast_history.append(broadcast_msg)
         
-        # Notify subscribers
-        for callback in self.subscribers.get(protocol_tag, []):
-            try:
-                await callback(broadcast_msg)
-            except Exception as e:
-                logging.error(f"Broadcast callback error: {e}")
+        # Notify subscribers, max_fanout workers sharing one iterator
+        callbacks = self.subscribers.get(protocol_tag)
+        if not callbacks:
+            return
+        remaining = iter(list(callbacks))
+        
+        async def deliver():
+            for callback in remaining:
+                try:
+                    await callback(broadcast_msg)
+                except Exception as e:
+                    logging.error(f"Broadcast callback error: {e}")
+        
+        await asyncio.gather(*(deliver() for _ in range(min(self.max_fanout, len(callbacks)))))
     
     async def send_targeted(self, target_agent: str, protocol_tag: str, 
                           message: Dict[str, Any]) -> None:
         """Send targeted message to specific agent"""
+        while self.pending >= self.high_watermark and _HANDLING_PROTOCOL.get() is None:
+            self.backpressure_waits += 1
+            self.below_watermark.clear()
+            await self.below_watermark.wait()
+        
         targeted_msg = {
             'timestamp': time.time(),
             'sender': self.agent_id,
@@ -283,50 +831,394 @@ class BroadcastChannel:
             'message_id': str(uuid.uuid4())
         }
         
+        self.pending += 1
         await self.message_queue.put(targeted_msg)
+    
+    async def receive(self) -> Dict[str, Any]:
+        """Wait for the next queued message"""
+        return await self.message_queue.get()
+    
+    def message_done(self) -> None:
+        """Mark a received message as handled, releasing backpressure"""
+        self.pending = max(0, self.pending - 1)
+        if self.pending <= self.low_watermark:
+            self.below_watermark.set()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'pending': self.pending,
+            'queued': self.message_queue.qsize(),
+            'high_watermark': self.high_watermark,
+            'backpressure_waits': self.backpressure_waits
+        }
+
+
+# Segment files: length-prefixed JSON records and a fixed-width index
+LOG_RECORD_HEADER = struct.Struct('>dI')   # timestamp, payload length
+LOG_INDEX_ENTRY = struct.Struct('>dQ')     # timestamp, record offset
+
+
+class LogSegment:
+    """
+    One sealed, time-ordered run of commit entries
+    
+    On disk a segment is a data file of records plus an index file of
+    (timestamp, offset) pairs. Both are memory-mapped on first read, so a
+    lookup binary-searches the index and decodes only the records it
+    returns. In-memory segments (no log directory) keep their entries.
+    """
+    
+    def __init__(self, base_seq: int, count: int, first_time: float, last_time: float,
+                 data_path: Optional[str] = None, entries: Optional[List[CommitEntry]] = None):
+        self.base_seq = base_seq
+        self.count = count
+        self.first_time = first_time
+        self.last_time = last_time
+        self.data_path = data_path
+        self.entries = entries
+        self.times = [entry.timestamp for entry in entries] if entries is not None else None
+        self.data_map: Optional[mmap.mmap] = None
+        self.index_map: Optional[mmap.mmap] = None
+    
+    @property
+    def index_path(self) -> str:
+        return self.data_path[:-len('.log')] + '.idx'
+    
+    def _map(self) -> None:
+        if self.data_map is None:
+            with open(self.data_path, 'rb') as f:
+                self.data_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            with open(self.index_path, 'rb') as f:
+                self.index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def bisect_right(self, timestamp: float) -> int:
+        """Number of entries with a timestamp <= `timestamp`"""
+        if self.times is not None:
+            return bisect.bisect_right(self.times, timestamp)
+        
+        self._map()
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if LOG_INDEX_ENTRY.unpack_from(self.index_map, mid * LOG_INDEX_ENTRY.size)[0] <= timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def read(self, start: int, stop: int) -> List[CommitEntry]:
+        """Entries start..stop-1"""
+        if self.entries is not None:
+            return self.entries[start:stop]
+        
+        self._map()
+        entries = []
+        for i in range(start, stop):
+            offset = LOG_INDEX_ENTRY.unpack_from(self.index_map, i * LOG_INDEX_ENTRY.size)[1]
+            entries.append(_read_log_record(self.data_map, offset)[0])
+        return entries
+    
+    def close(self) -> None:
+        for mapped in (self.data_map, self.index_map):
+            if mapped is not None:
+                mapped.close()
+        self.data_map = self.index_map = None
+    
+    def remove(self) -> None:
+        self.close()
+        if self.data_path:
+            for path in (self.data_path, self.index_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def _read_log_record(buffer, offset: int) -> Tuple[CommitEntry, int]:
+    """Decode the record at `offset`; returns the entry and the next offset"""
+    timestamp, length = LOG_RECORD_HEADER.unpack_from(buffer, offset)
+    start = offset + LOG_RECORD_HEADER.size
+    if start + length > len(buffer):
+        raise ValueError("Truncated commit log record")
+    data = json.loads(bytes(buffer[start:start + length]))
+    data['timestamp'] = timestamp
+    return CommitEntry.from_dict(data), start + length
 
 
 class RecoveryLogManager:
-    """Maintains commit logs and rollback checkpoints"""
+    """
+    Maintains commit logs and rollback checkpoints
     
-    def __init__(self, max_entries: int = 10000):
-        self.commit_log: List[CommitEntry] = []
+    The commit log is append-only and split into segments of
+    `segment_entries` entries. Timestamps never decrease, so rollback and
+    replay lookups bisect the segment start times and then the segment's
+    own index: O(log n) plus the entries returned. With a `log_dir` the
+    log and the checkpoints survive restarts; recovery reads segment
+    indexes lazily and only rescans the unsealed tail segment. Once more
+    than `max_entries` entries are retained, or more than
+    `max_checkpoints` checkpoints exist, the oldest whole segments (and
+    those entirely before the oldest checkpoint) are dropped.
+    """
+    
+    def __init__(self, max_entries: int = 10000, log_dir: Optional[str] = None,
+                 segment_entries: int = 1024, max_checkpoints: int = 16):
         self.checkpoints: Dict[str, StateSnapshot] = {}
         self.max_entries = max_entries
+        self.segment_entries = segment_entries
+        self.max_checkpoints = max_checkpoints
+        self.log_dir = log_dir
         self.lock = threading.Lock()
+        
+        # Sealed segments, oldest first, and their start times for bisect
+        self.segments: List[LogSegment] = []
+        self.segment_starts: List[float] = []
+        self.sealed_entries = 0
+        
+        # Tail segment being appended to
+        self.active: List[CommitEntry] = []
+        self.active_times: List[float] = []
+        self.active_offsets: List[int] = []
+        self.active_base = 0
+        self.active_file = None
+        self.active_size = 0
+        self.last_timestamp = 0.0
+        
+        self.checkpoint_journal = None
+        
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            self._recover()
+            self.checkpoint_journal = open(self._checkpoint_path(), 'a', encoding='utf-8')
+    
+    def _segment_path(self, base_seq: int) -> str:
+        return os.path.join(self.log_dir, f"segment-{base_seq:012d}.log")
+    
+    def _checkpoint_path(self) -> str:
+        return os.path.join(self.log_dir, 'checkpoints.log')
     
     def log_commit(self, operation: str, state_hash: str, 
                    affected_nodes: List[str], vector_clock: VectorClock,
                    rollback_data: Optional[Dict] = None) -> None:
         """Log a commit operation"""
         with self.lock:
+            # Keep the log time-ordered even if the wall clock steps back
+            self.last_timestamp = max(time.time(), self.last_timestamp)
             entry = CommitEntry(
-                timestamp=time.time(),
+                timestamp=self.last_timestamp,
                 operation=operation,
                 state_hash=state_hash,
                 affected_nodes=affected_nodes,
-                vector_clock=VectorClock(vector_clock.clocks.copy()),
+                vector_clock=vector_clock.copy(),
                 rollback_data=rollback_data
             )
             
-            self.commit_log.append(entry)
+            if self.log_dir:
+                self._write_record(entry)
+            self.active.append(entry)
+            self.active_times.append(entry.timestamp)
+            
+            if len(self.active) >= self.segment_entries:
+                self._seal()
             
             # Trim log if too large
-            if len(self.commit_log) > self.max_entries:
-                self.commit_log = self.commit_log[-self.max_entries//2:]
+            while self.segments and self.sealed_entries + len(self.active) > self.max_entries:
+                self._drop_oldest_segment()
+    
+    def _write_record(self, entry: CommitEntry) -> None:
+        if self.active_file is None:
+            self.active_file = open(self._segment_path(self.active_base), 'ab')
+            self.active_size = self.active_file.tell()
+        
+        data = entry.to_dict()
+        del data['timestamp']
+        payload = json.dumps(data).encode()
+        self.active_file.write(LOG_RECORD_HEADER.pack(entry.timestamp, len(payload)) + payload)
+        self.active_file.flush()
+        self.active_offsets.append(self.active_size)
+        self.active_size += LOG_RECORD_HEADER.size + len(payload)
+    
+    def _seal(self) -> None:
+        """Turn the tail into a sealed segment and start a new one"""
+        count = len(self.active)
+        if not count:
+            return
+        
+        if self.log_dir:
+            data_path = self._segment_path(self.active_base)
+            if self.active_file is not None:
+                os.fsync(self.active_file.fileno())
+                self.active_file.close()
+                self.active_file = None
+            self._write_index(data_path, self.active_times, self.active_offsets)
+            segment = LogSegment(self.active_base, count, self.active_times[0],
+                                 self.active_times[-1], data_path=data_path)
+        else:
+            segment = LogSegment(self.active_base, count, self.active_times[0],
+                                 self.active_times[-1], entries=self.active)
+        
+        self.segments.append(segment)
+        self.segment_starts.append(segment.first_time)
+        self.sealed_entries += count
+        self.active_base += count
+        self.active = []
+        self.active_times = []
+        self.active_offsets = []
+        self.active_size = 0
+    
+    @staticmethod
+    def _write_index(data_path: str, times: List[float], offsets: List[int]) -> None:
+        index_path = data_path[:-len('.log')] + '.idx'
+        temp_path = f"{index_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(b''.join(LOG_INDEX_ENTRY.pack(t, o) for t, o in zip(times, offsets)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, index_path)
+    
+    def _drop_oldest_segment(self) -> None:
+        segment = self.segments.pop(0)
+        self.segment_starts.pop(0)
+        self.sealed_entries -= segment.count
+        segment.remove()
+    
+    def _recover(self) -> None:
+        """Rebuild segment metadata and the tail segment from `log_dir`"""
+        bases = sorted(
+            int(name[len('segment-'):-len('.log')])
+            for name in os.listdir(self.log_dir)
+            if name.startswith('segment-') and name.endswith('.log')
+        )
+        
+        for position, base_seq in enumerate(bases):
+            data_path = self._segment_path(base_seq)
+            segment = LogSegment(base_seq, 0, 0.0, 0.0, data_path=data_path)
+            
+            if os.path.exists(segment.index_path):
+                size = os.path.getsize(segment.index_path)
+                segment.count = size // LOG_INDEX_ENTRY.size
+                with open(segment.index_path, 'rb') as f:
+                    segment.first_time = LOG_INDEX_ENTRY.unpack(f.read(LOG_INDEX_ENTRY.size))[0]
+                    f.seek(size - LOG_INDEX_ENTRY.size)
+                    segment.last_time = LOG_INDEX_ENTRY.unpack(f.read(LOG_INDEX_ENTRY.size))[0]
+            else:
+                # Unsealed: the tail segment, or one whose seal was interrupted
+                entries, offsets = self._scan_segment(data_path)
+                if position < len(bases) - 1 and entries:
+                    self._write_index(data_path, [e.timestamp for e in entries], offsets)
+                    segment.count = len(entries)
+                    segment.first_time = entries[0].timestamp
+                    segment.last_time = entries[-1].timestamp
+                else:
+                    self.active = entries
+                    self.active_times = [entry.timestamp for entry in entries]
+                    self.active_offsets = offsets
+                    self.active_base = base_seq
+                    if entries:
+                        self.last_timestamp = entries[-1].timestamp
+                    continue
+            
+            if segment.count:
+                self.segments.append(segment)
+                self.segment_starts.append(segment.first_time)
+                self.sealed_entries += segment.count
+                self.active_base = base_seq + segment.count
+                self.last_timestamp = max(self.last_timestamp, segment.last_time)
+        
+        self._load_checkpoints()
+        logging.info(f"Recovered {self.sealed_entries + len(self.active)} commit log entries "
+                     f"in {len(self.segments) + bool(self.active)} segments from {self.log_dir}")
+    
+    @staticmethod
+    def _scan_segment(data_path: str) -> Tuple[List[CommitEntry], List[int]]:
+        """Read every record of a segment, truncating a torn final record"""
+        with open(data_path, 'rb') as f:
+            buffer = f.read()
+        
+        entries, offsets = [], []
+        offset = 0
+        while offset < len(buffer):
+            try:
+                entry, next_offset = _read_log_record(buffer, offset)
+            except (struct.error, ValueError, KeyError, TypeError) as e:
+                logging.warning(f"Truncating commit log {data_path} at offset {offset}: {e}")
+                with open(data_path, 'r+b') as f:
+                    f.truncate(offset)
+                break
+            entries.append(entry)
+            offsets.append(offset)
+            offset = next_offset
+        return entries, offsets
+    
+    def _load_checkpoints(self) -> None:
+        path = self._checkpoint_path()
+        if not os.path.exists(path):
+            return
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    if record['op'] == 'add':
+                        self.checkpoints.pop(record['id'], None)
+                        self.checkpoints[record['id']] = StateSnapshot(**record['snapshot'])
+                    else:
+                        self.checkpoints.pop(record['id'], None)
+                except (ValueError, KeyError, TypeError) as e:
+                    # A torn final line from a crash mid-write
+                    logging.warning(f"Skipping unreadable checkpoint record: {e}")
+    
+    def _journal_checkpoint(self, record: Dict[str, Any]) -> None:
+        if self.checkpoint_journal is not None:
+            self.checkpoint_journal.write(json.dumps(record) + '\n')
+            self.checkpoint_journal.flush()
     
     def create_checkpoint(self, checkpoint_id: str, snapshot: StateSnapshot) -> None:
         """Create a rollback checkpoint"""
         with self.lock:
+            self.checkpoints.pop(checkpoint_id, None)
             self.checkpoints[checkpoint_id] = snapshot
+            self._journal_checkpoint({'op': 'add', 'id': checkpoint_id, 'snapshot': asdict(snapshot)})
+            
+            if len(self.checkpoints) > self.max_checkpoints:
+                while len(self.checkpoints) > self.max_checkpoints:
+                    self.checkpoints.pop(next(iter(self.checkpoints)))
+                self._compact()
+    
+    def _compact(self) -> None:
+        """
+        Drop segments no retained checkpoint can replay from and rewrite
+        the checkpoint journal with the live checkpoints only
+        """
+        oldest = min(snapshot.timestamp for snapshot in self.checkpoints.values())
+        while self.segments and self.segments[0].last_time <= oldest:
+            self._drop_oldest_segment()
+        
+        if self.checkpoint_journal is None:
+            return
+        
+        path = self._checkpoint_path()
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for checkpoint_id, snapshot in self.checkpoints.items():
+                f.write(json.dumps({'op': 'add', 'id': checkpoint_id, 'snapshot': asdict(snapshot)}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        
+        self.checkpoint_journal.close()
+        os.replace(temp_path, path)
+        self.checkpoint_journal = open(path, 'a', encoding='utf-8')
     
     def get_rollback_point(self, target_time: float) -> Optional[CommitEntry]:
         """Find the best rollback point before target time"""
         with self.lock:
-            candidates = [entry for entry in self.commit_log 
-                         if entry.timestamp <= target_time]
+            position = bisect.bisect_right(self.active_times, target_time)
+            if position:
+                return self.active[position - 1]
             
-            return max(candidates, key=lambda x: x.timestamp) if candidates else None
+            index = bisect.bisect_right(self.segment_starts, target_time) - 1
+            if index < 0:
+                return None
+            segment = self.segments[index]
+            position = segment.bisect_right(target_time)
+            return segment.read(position - 1, position)[0]
     
     def replay_from_checkpoint(self, checkpoint_id: str, 
                               target_time: float) -> List[CommitEntry]:
@@ -337,8 +1229,40 @@ class RecoveryLogManager:
         checkpoint_time = self.checkpoints[checkpoint_id].timestamp
         
         with self.lock:
-            return [entry for entry in self.commit_log 
-                   if checkpoint_time < entry.timestamp <= target_time]
+            entries = []
+            index = max(bisect.bisect_right(self.segment_starts, checkpoint_time) - 1, 0)
+            for segment in self.segments[index:]:
+                if segment.first_time > target_time:
+                    break
+                if segment.last_time <= checkpoint_time:
+                    continue
+                entries.extend(segment.read(segment.bisect_right(checkpoint_time),
+                                            segment.bisect_right(target_time)))
+            
+            start = bisect.bisect_right(self.active_times, checkpoint_time)
+            stop = bisect.bisect_right(self.active_times, target_time)
+            entries.extend(self.active[start:stop])
+            return entries
+    
+    def get_log_stats(self) -> Dict[str, Any]:
+        """Get commit log statistics"""
+        return {
+            'entries': self.sealed_entries + len(self.active),
+            'segments': len(self.segments) + bool(self.active),
+            'checkpoints': len(self.checkpoints),
+            'log_dir': self.log_dir
+        }
+    
+    def close(self) -> None:
+        with self.lock:
+            if self.active_file is not None:
+                self.active_file.close()
+                self.active_file = None
+            if self.checkpoint_journal is not None:
+                self.checkpoint_journal.close()
+                self.checkpoint_journal = None
+            for segment in self.segments:
+                segment.close()
 
 
 class QuorumChecker:
@@ -394,11 +1318,18 @@ class QuorumChecker:
         return False, "Quorum not reached"
 
 
+# Protocol tags with dedicated handler pools
+PROTOCOL_TAGS = ("SYNC-REQUEST", "FPR-SYNC", "SYNC-MERKLE", "SYNC-DELTA", "RES-USAGE-SYNC", "MORAL-SYNC")
+
+
 class SynchroniserAgent:
     """Main Synchroniser Agent - The heartbeat of coherence"""
     
     def __init__(self, agent_id: str, variant: str = "AETHRA", 
-                 serial: str = None, quorum_size: int = 3):
+                 serial: str = None, quorum_size: int = 3,
+                 log_dir: Optional[str] = None, handler_pool_size: int = 4,
+                 handler_pools: Optional[Dict[str, int]] = None,
+                 broadcast_fanout: int = 16, queue_watermark: int = 1000):
         # Generate agent ID
         if serial is None:
             serial = f"{int(time.time()) % 10000:04d}"
@@ -410,12 +1341,13 @@ class SynchroniserAgent:
         # Core components
         self.clock_syncer = ClockSyncer(self.agent_id)
         self.state_differ = StateDiffer()
-        self.broadcast_channel = BroadcastChannel(self.agent_id)
-        self.recovery_manager = RecoveryLogManager()
+        self.broadcast_channel = BroadcastChannel(self.agent_id, broadcast_fanout, queue_watermark)
+        self.recovery_manager = RecoveryLogManager(log_dir=log_dir)
         self.quorum_checker = QuorumChecker(quorum_size, quorum_size)
         
         # State management
         self.state_snapshots: Dict[str, StateSnapshot] = {}
+        self.merkle_tree = MerkleTree()
         self.sync_mode = SyncMode.STEADY_BEAT
         self.status = AgentStatus.ALIVE
         self.sequence_number = 0
@@ -430,9 +1362,18 @@ class SynchroniserAgent:
             'heartbeat_frequency': 0,
             'rollback_events': 0,
             'cluster_drift_index': 0.0,
-            'commit_integrity_score': 1.0
+            'commit_integrity_score': 1.0,
+            'merkle_rounds': 0,
+            'keys_transferred': 0,
+            'protocol_latency': defaultdict(LatencyHistogram)
         }
         
+        # Protocol dispatch: one queue and worker pool per protocol tag
+        self.handler_pool_size = handler_pool_size
+        self.handler_pools = dict(handler_pools or {})
+        self.protocol_queues: Dict[str, asyncio.Queue] = {}
+        self.protocol_workers: Dict[str, List[asyncio.Task]] = {}
+        
         # Background tasks
         self.running = False
         self.tasks: List[asyncio.Task] = []
@@ -481,15 +1422,17 @@ class SynchroniserAgent:
         # Sign the beat
         message_str = json.dumps(beat_data, sort_keys=True)
         signature = self._sign_message(message_str)
+        vector_clock, clock_delta = self.clock_syncer.beat_clock()
         
         return SyncBeat(
             timestamp=beat_data['timestamp'],
             agent_id=self.agent_id,
             status=self.status,
-            vector_clock=self.clock_syncer.tick(),
+            vector_clock=vector_clock,
             state_hash=state_hash,
             signature=signature,
-            sequence_number=self.sequence_number
+            sequence_number=self.sequence_number,
+            clock_delta=clock_delta
         )
     
     async def process_beat(self, beat: SyncBeat) -> None:
@@ -499,7 +1442,7 @@ class SynchroniserAgent:
             return
         
         # Update vector clock
-        self.clock_syncer.sync_with_peer(beat.vector_clock)
+        self.clock_syncer.sync_with_peer(beat.vector_clock, beat.agent_id, beat.clock_delta)
         
         # Record metrics
         latency = time.time() - beat.timestamp
@@ -509,17 +1452,24 @@ class SynchroniserAgent:
     
     def receive_state(self, node_id: str, state_data: Dict[str, Any], 
                      version: int = 1) -> None:
-        """Store state snapshot from a node"""
+        """
+        Store state snapshot from a node
+        
+        Values are treated as immutable once stored: only keys whose value
+        changed since the previous snapshot are re-hashed, both for the
+        snapshot checksum and for the Merkle tree.
+        """
         snapshot = StateSnapshot(
             node_id=node_id,
             timestamp=time.time(),
-            data=state_data,
+            data=dict(state_data),
             version=version,
             checksum=""
         )
-        snapshot.checksum = snapshot.compute_checksum()
+        changed = snapshot.derive_checksum(self.state_snapshots.get(node_id))
         
         self.state_snapshots[node_id] = snapshot
+        self._index_snapshot(snapshot, changed)
         
         # Log the state update
         self.recovery_manager.log_commit(
@@ -529,6 +1479,16 @@ class SynchroniserAgent:
             vector_clock=self.clock_syncer.vector_clock
         )
     
+    def _index_snapshot(self, snapshot: StateSnapshot, keys: Iterable[str]) -> None:
+        """Apply the given keys of a snapshot to the Merkle tree (keys it lacks are deleted)"""
+        digests = snapshot.key_digests()
+        for key in keys:
+            digest = digests.get(key)
+            if digest is None:
+                self.merkle_tree.delete(merkle_key(snapshot.node_id, key))
+            else:
+                self.merkle_tree.set(merkle_key(snapshot.node_id, key), digest)
+    
     def detect_drift(self) -> bool:
         """Check if node states have diverged significantly"""
         if len(self.state_snapshots) < 2:
@@ -545,9 +1505,8 @@ class SynchroniserAgent:
         self.metrics['cluster_drift_index'] = drift_ratio
         
         return drift_ratio > 0.5  # More than 50% divergence
-
-                
-     async def resolve_drift(self) -> Optional[StateSnapshot]:
+    
+    async def resolve_drift(self) -> Optional[StateSnapshot]:
         """Resolve state drift using consensus"""
         if not self.detect_drift():
             return None
@@ -596,9 +1555,11 @@ class SynchroniserAgent:
             
             # Clear current state snapshots
             self.state_snapshots.clear()
+            self.merkle_tree = MerkleTree(self.merkle_tree.fanout, self.merkle_tree.depth)
             
             # Restore from checkpoint
             self.state_snapshots[checkpoint.node_id] = checkpoint
+            self._index_snapshot(checkpoint, checkpoint.data)
             
             # Log rollback operation
             self.recovery_manager.log_commit(
@@ -629,27 +1590,61 @@ class SynchroniserAgent:
                 # Send sync request
                 await self.broadcast_channel.send_targeted(peer, "SYNC-REQUEST", {
                     'requester': self.agent_id,
-                    'vector_clock': asdict(self.clock_syncer.vector_clock),
-                    'state_hash': self.state_differ.compute_state_hash(
-                        {k: asdict(v) for k, v in self.state_snapshots.items()}
-                    )
+                    'vector_clock': self.clock_syncer.vector_clock.to_dict(),
+                    'merkle_root': self.merkle_tree.root()
                 })
                 
             except Exception as e:
                 self.logger.error(f"Failed to sync with peer {peer}: {e}")
     
     async def handle_protocol_messages(self) -> None:
-        """Handle incoming protocol messages"""
-        while self.running:
+        """
+        Handle incoming protocol messages
+        
+        Waits on the channel queue and hands each message to its protocol's
+        pool of `handler_pools[tag]` workers (default `handler_pool_size`),
+        so a slow SYNC-DELTA does not hold up SYNC-REQUEST handling.
+        Unknown tags share one single-worker pool.
+        """
+        try:
+            while self.running:
+                message = await self.broadcast_channel.receive()
+                protocol = message.get('protocol')
+                tag = protocol if protocol in PROTOCOL_TAGS else '*'
+                self._protocol_queue(tag).put_nowait(message)
+        finally:
+            workers = [task for tasks in self.protocol_workers.values() for task in tasks]
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.protocol_queues.clear()
+            self.protocol_workers.clear()
+    
+    def _protocol_queue(self, tag: str) -> asyncio.Queue:
+        queue = self.protocol_queues.get(tag)
+        if queue is None:
+            queue = self.protocol_queues[tag] = asyncio.Queue()
+            size = 1 if tag == '*' else self.handler_pools.get(tag, self.handler_pool_size)
+            self.protocol_workers[tag] = [
+                asyncio.create_task(self._protocol_worker(tag, queue)) for _ in range(max(1, size))
+            ]
+        return queue
+    
+    async def _protocol_worker(self, tag: str, queue: asyncio.Queue) -> None:
+        _HANDLING_PROTOCOL.set(tag)
+        histograms = self.metrics['protocol_latency']
+        
+        while True:
+            message = await queue.get()
             try:
-                if not self.broadcast_channel.message_queue.empty():
-                    message = await self.broadcast_channel.message_queue.get()
-                    await self._process_protocol_message(message)
-                
-                await asyncio.sleep(0.1)  # Small delay to prevent busy waiting
-                
+                await self._process_protocol_message(message)
             except Exception as e:
-                self.logger.error(f"Error handling protocol messages: {e}")
+                self.logger.error(f"Error handling {message.get('protocol')} message: {e}")
+            finally:
+                # Queueing plus handling time since the message was sent
+                sent_at = message.get('timestamp') or time.time()
+                histograms[tag].observe(max(0.0, time.time() - sent_at))
+                self.broadcast_channel.message_done()
     
     async def _process_protocol_message(self, message: Dict[str, Any]) -> None:
         """Process a specific protocol message"""
@@ -660,7 +1655,9 @@ class SynchroniserAgent:
             await self._handle_sync_request(message)
         elif protocol == "FPR-SYNC":
             await self._handle_fingerprint_sync(message)
-        elif protocol == "SYNC-DELTA":()
+        elif protocol == "SYNC-MERKLE":
+            await self._handle_merkle_sync(message)
+        elif protocol == "SYNC-DELTA":
             await self._handle_delta_sync(message)
         elif protocol == "RES-USAGE-SYNC":
             await self._handle_resource_sync(message)
@@ -677,12 +1674,127 @@ class SynchroniserAgent:
         # Update our clock with peer's clock
         self.clock_syncer.sync_with_peer(peer_clock)
         
-        # Send our current state
-        await self.broadcast_channel.send_targeted(requester, "SYNC-RESPONSE", {
-            'responder': self.agent_id,
-            'vector_clock': asdict(self.clock_syncer.vector_clock),
-            'state_snapshots': {k: asdict(v) for k, v in self.state_snapshots.items()}
-        })
+        remote_root = message['payload'].get('merkle_root')
+        if remote_root is None:
+            # Peer without Merkle support: send our full state
+            await self.broadcast_channel.send_targeted(requester, "SYNC-RESPONSE", {
+                'responder': self.agent_id,
+                'vector_clock': self.clock_syncer.vector_clock.to_dict(),
+                'state_snapshots': {k: asdict(v) for k, v in self.state_snapshots.items()}
+            })
+        elif remote_root == self.merkle_tree.root():
+            await self.broadcast_channel.send_targeted(requester, "SYNC-RESPONSE", {
+                'responder': self.agent_id,
+                'vector_clock': self.clock_syncer.vector_clock.to_dict(),
+                'in_sync': True
+            })
+        else:
+            # Start the descent with the root's children
+            await self.broadcast_channel.send_targeted(requester, "SYNC-MERKLE", {
+                'responder': self.agent_id,
+                'level': 1,
+                'hashes': self.merkle_tree.child_hashes(0, [0])
+            })
+    
+    async def _handle_merkle_sync(self, message: Dict[str, Any]) -> None:
+        """
+        Merkle anti-entropy descent
+        
+        The responder sends hashes one level at a time; the requester answers
+        with the diverging subtrees to expand and, at the leaves, with the
+        diverging buckets, which the responder returns as a SYNC-DELTA.
+        """
+        payload = message['payload']
+        tree = self.merkle_tree
+        
+        if 'hashes' in payload:
+            # Requester side: compare a level of the responder's tree with ours
+            responder = payload['responder']
+            level = payload['level']
+            diverging = tree.diverging(level, payload['hashes'])
+            self.metrics['merkle_rounds'] += 1
+            if not diverging:
+                return
+            
+            request = {'requester': self.agent_id}
+            if level == tree.depth:
+                request['buckets'] = diverging
+                # Nodes we hold keys for there, so the responder can tell
+                # us which of them it has deleted
+                request['nodes'] = sorted({key.split('\x1f', 1)[0] for key in tree.keys_in(diverging)})
+            else:
+                request['level'] = level
+                request['expand'] = diverging
+            await self.broadcast_channel.send_targeted(responder, "SYNC-MERKLE", request)
+        
+        elif 'expand' in payload:
+            # Responder side: next level down for the diverging subtrees
+            level = payload['level']
+            await self.broadcast_channel.send_targeted(payload['requester'], "SYNC-MERKLE", {
+                'responder': self.agent_id,
+                'level': level + 1,
+                'hashes': tree.child_hashes(level, payload['expand'])
+            })
+        
+        elif 'buckets' in payload:
+            # Responder side: our entries in the diverging key ranges. Every
+            # node the requester holds there gets a version header even when
+            # we have no keys left in those buckets, so deletions propagate.
+            buckets = payload['buckets']
+            snapshots: Dict[str, Dict[str, Any]] = {}
+            for node_id in payload.get('nodes', self.state_snapshots):
+                snapshot = self.state_snapshots.get(node_id)
+                if snapshot is not None:
+                    snapshots[node_id] = {'version': snapshot.version, 'data': {}}
+            for key in tree.keys_in(buckets):
+                node_id, data_key = key.split('\x1f', 1)
+                snapshot = self.state_snapshots[node_id]
+                part = snapshots.setdefault(node_id, {
+                    'version': snapshot.version,
+                    'data': {}
+                })
+                part['data'][data_key] = snapshot.data[data_key]
+            
+            await self.broadcast_channel.send_targeted(payload['requester'], "SYNC-DELTA", {
+                'type': 'merkle_delta',
+                'responder': self.agent_id,
+                'buckets': buckets,
+                'snapshots': snapshots
+            })
+    
+    def apply_merkle_delta(self, payload: Dict[str, Any]) -> int:
+        """
+        Merge a peer's entries for some key ranges into our snapshots
+        
+        A node's entries are taken when the peer's snapshot version is newer
+        than ours (or we have none); our keys of that node inside the
+        transferred buckets that the peer lacks are then deleted, including
+        when the peer sends only the version header with no data. Equal
+        versions with different values are left to drift resolution.
+        Returns the number of keys changed.
+        """
+        buckets = set(payload['buckets'])
+        changed = 0
+        
+        for node_id, part in payload['snapshots'].items():
+            local = self.state_snapshots.get(node_id)
+            if local is not None and local.version >= part['version']:
+                continue
+            
+            data = dict(local.data) if local is not None else {}
+            for key in list(data):
+                if key not in part['data'] and self.merkle_tree.bucket_of(merkle_key(node_id, key)) in buckets:
+                    del data[key]
+                    changed += 1
+            for key, value in part['data'].items():
+                if data.get(key, value) != value or key not in data:
+                    changed += 1
+                data[key] = value
+            
+            self.receive_state(node_id, data, version=part['version'])
+        
+        self.metrics['keys_transferred'] += changed
+        return changed
     
     async def _handle_fingerprint_sync(self, message: Dict[str, Any]) -> None:
         """Handle fingerprint synchronization from Hasher agents"""
@@ -694,7 +1806,10 @@ class SynchroniserAgent:
         """Handle delta synchronization updates"""
         delta_type = message['payload'].get('type')
         
-        if delta_type == 'drift_resolution':
+        if delta_type == 'merkle_delta':
+            changed = self.apply_merkle_delta(message['payload'])
+            self.logger.info(f"Applied Merkle delta from {message['payload']['responder']}: {changed} keys changed")
+        elif delta_type == 'drift_resolution':
             proposal_id = message['payload']['proposal_id']
             # Auto-approve for demonstration (in production, this would be more complex)
             self.quorum_checker.cast_vote(proposal_id, self.agent_id, True, 
@@ -755,6 +1870,7 @@ class SynchroniserAgent:
         
         # Wait for tasks to complete cancellation
         await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.recovery_manager.close()
         
         self.logger.info(f"Synchroniser Agent {self.agent_id} stopped")
     
@@ -773,7 +1889,12 @@ class SynchroniserAgent:
             'cluster_drift_index': self.metrics['cluster_drift_index'],
             'commit_integrity_score': self.metrics['commit_integrity_score'],
             'active_snapshots': len(self.state_snapshots),
-            'vector_clock': asdict(self.clock_syncer.vector_clock)
+            'commit_log': self.recovery_manager.get_log_stats(),
+            'protocol_latency': {
+                tag: histogram.summary() for tag, histogram in self.metrics['protocol_latency'].items()
+            },
+            'protocol_queue': self.broadcast_channel.get_stats(),
+            'vector_clock': self.clock_syncer.vector_clock.to_dict()
         }
 
 
@@ -806,4 +1927,209 @@ async def demo_synchroniser_agent():
     
     # Let them run for a bit
 
-    await asyncio.sleep(5)
\ No newline at end of file
+    await asyncio.sleep(5)
+    
+    for agent in agents:
+        print(json.dumps(agent.get_metrics(), indent=2, default=str))
+        await agent.stop()
+    
+    await asyncio.gather(*agent_tasks, return_exceptions=True)
+
+
+def _json_majority(snapshots: List[StateSnapshot]) -> Tuple[Dict[str, Any], str]:
+    """Reference resolution that votes on sorted-key JSON strings (benchmark baseline)"""
+    all_keys = set()
+    for snapshot in snapshots:
+        all_keys.update(snapshot.data.keys())
+    
+    resolved = {}
+    for key in all_keys:
+        values = [json.dumps(s.data[key], sort_keys=True) for s in snapshots if key in s.data]
+        resolved[key] = json.loads(Counter(values).most_common(1)[0][0])
+    
+    checksum = hashlib.sha256(json.dumps(resolved, sort_keys=True).encode()).hexdigest()
+    return resolved, checksum
+
+
+def benchmark_conflict_resolution(snapshots: int = 50, keys: int = 10000,
+                                  divergence: float = 0.05, updates: int = 10) -> Dict[str, Any]:
+    """
+    Majority resolution of `snapshots` snapshots of `keys` keys each
+    
+    Each snapshot disagrees with the common state on a `divergence`
+    fraction of keys. `initial` hashes every snapshot from scratch and
+    resolves; `update_round` is the steady state, where every node reports
+    a new version with `updates` changed keys before resolution. The JSON
+    baseline re-encodes whole states for checksums and every value to vote.
+    """
+    rng = random.Random(7)
+    base = {
+        f"account_{i}": {'balance': i * 10, 'owner': f"node_{i % 97}", 'tags': ['active', i % 5]}
+        for i in range(keys)
+    }
+    key_list = list(base)
+    states = []
+    for n in range(snapshots):
+        state = dict(base)
+        for key in rng.sample(key_list, int(keys * divergence)):
+            state[key] = dict(base[key], balance=rng.randrange(10 ** 6))
+        states.append(state)
+    
+    updated_states = []
+    for state in states:
+        state = dict(state)
+        for key in rng.sample(key_list, updates):
+            state[key] = dict(base[key], balance=-1)
+        updated_states.append(state)
+    
+    def json_round(round_states):
+        start = time.perf_counter()
+        for state in round_states:
+            hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()
+        checksums = time.perf_counter() - start
+        resolved, _ = _json_majority([
+            StateSnapshot(f"node_{n}", 0.0, state, 1, "") for n, state in enumerate(round_states)
+        ])
+        return resolved, checksums, time.perf_counter() - start - checksums
+    
+    def digest_round(round_states, previous):
+        start = time.perf_counter()
+        built = []
+        for n, state in enumerate(round_states):
+            snapshot = StateSnapshot(f"node_{n}", 0.0, state, 2 if previous else 1, "")
+            snapshot.derive_checksum(previous[n] if previous else None)
+            built.append(snapshot)
+        checksums = time.perf_counter() - start
+        resolved = differ.resolve_conflicts(built)
+        return built, resolved, checksums, time.perf_counter() - start - checksums
+    
+    def report(json_result, digest_result):
+        json_total = json_result[1] + json_result[2]
+        digest_total = digest_result[2] + digest_result[3]
+        return {
+            'results_match': json_result[0] == digest_result[1].data,
+            'json_checksums_s': round(json_result[1], 3),
+            'json_resolve_s': round(json_result[2], 3),
+            'digest_checksums_s': round(digest_result[2], 3),
+            'digest_resolve_s': round(digest_result[3], 3),
+            'speedup': round(json_total / digest_total, 1),
+        }
+    
+    differ = StateDiffer()
+    initial = digest_round(states, None)
+    initial_report = report(json_round(states), initial)
+    update = digest_round(updated_states, initial[0])
+    update_report = report(json_round(updated_states), update)
+    
+    update_report['checksums_match'] = all(
+        snapshot.checksum == StateSnapshot(snapshot.node_id, 0.0, snapshot.data, 2, "").compute_checksum()
+        for snapshot in update[0]
+    )
+    return {
+        'snapshots': snapshots,
+        'keys': keys,
+        'changed_keys_per_update': updates,
+        'initial': initial_report,
+        'update_round': update_report,
+    }
+
+
+def benchmark_heartbeats(agents: int = 300, beats: int = 20000, gossip: int = 2) -> Dict[str, Any]:
+    """
+    Heartbeat clock throughput for one agent hearing from a cluster
+    
+    Every agent's clock starts populated for the whole cluster; before
+    each beat the sender advances `gossip` other entries. Each beat is
+    ticked, encoded to JSON, decoded and merged, and the receiver then
+    orders its clock against the sender's. The baseline uses the former
+    dict clocks (full copy, full merge, key-set union compare).
+    """
+    rng = random.Random(11)
+    ids = [f"SYNC-CLUSTER-{i:04d}-{uuid.UUID(int=rng.getrandbits(128))}" for i in range(agents)]
+    receiver_id, senders = ids[0], ids[1:]
+    schedule = [(senders[n % len(senders)], rng.sample(ids, gossip)) for n in range(beats)]
+    initial = {node_id: rng.randrange(1000) for node_id in ids}
+    
+    def dict_compare(mine: Dict[str, int], theirs: Dict[str, int]) -> str:
+        mine_greater = theirs_greater = False
+        for key in set(mine) | set(theirs):
+            if mine.get(key, 0) > theirs.get(key, 0):
+                mine_greater = True
+            elif theirs.get(key, 0) > mine.get(key, 0):
+                theirs_greater = True
+        return "after" if mine_greater and not theirs_greater else \
+            "before" if theirs_greater and not mine_greater else "concurrent"
+    
+    # Former representation
+    clocks = {node_id: dict(initial) for node_id in ids}
+    local = clocks[receiver_id]
+    wire_bytes = 0
+    start = time.perf_counter()
+    for sender, bumped in schedule:
+        clock = clocks[sender]
+        for node_id in bumped:
+            clock[node_id] += 1
+        clock[sender] += 1
+        wire = json.dumps({'vector_clock': {'clocks': dict(clock)}})
+        wire_bytes += len(wire)
+        peer = json.loads(wire)['vector_clock']['clocks']
+        dict_compare(local, peer)
+        for node_id, value in peer.items():
+            local[node_id] = max(local.get(node_id, 0), value)
+        local[receiver_id] += 1
+    dict_time = time.perf_counter() - start
+    dict_bytes = wire_bytes / beats
+    
+    # Interned array clocks with delta beats
+    syncers = {node_id: ClockSyncer(node_id) for node_id in ids}
+    for syncer in syncers.values():
+        syncer.vector_clock.update(VectorClock(initial))
+    receiver = syncers[receiver_id]
+    wire_bytes = 0
+    start = time.perf_counter()
+    for sender, bumped in schedule:
+        syncer = syncers[sender]
+        for node_id in bumped:
+            syncer.vector_clock.tick(node_id)
+        clock, delta = syncer.beat_clock()
+        wire = json.dumps({'vector_clock': clock.to_dict(), 'clock_delta': delta})
+        wire_bytes += len(wire)
+        data = json.loads(wire)
+        receiver.sync_with_peer(VectorClock.from_dict(data['vector_clock']), sender, data['clock_delta'])
+    array_time = time.perf_counter() - start
+    
+    return {
+        'agents': agents,
+        'beats': beats,
+        'dict_clocks': {
+            'beats_per_s': round(beats / dict_time),
+            'bytes_per_beat': round(dict_bytes),
+        },
+        'delta_clocks': {
+            'beats_per_s': round(beats / array_time),
+            'bytes_per_beat': round(wire_bytes / beats),
+        },
+        'speedup': round(dict_time / array_time, 1),
+        'clocks_match': receiver.vector_clock.clocks == {k: v for k, v in local.items() if v},
+    }
+
+
+def run_benchmark(kind: str):
+    """Print a benchmark report for `python synchronizer.py bench <kind>`"""
+    benchmarks = {
+        'resolve': benchmark_conflict_resolution,
+        'heartbeat': benchmark_heartbeats,
+    }
+    if kind not in benchmarks:
+        print(f"Unknown benchmark {kind!r}, choose from: {', '.join(benchmarks)}")
+        return
+    print(json.dumps(benchmarks[kind](), indent=2))
+
+
+if __name__ == "__main__":
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        run_benchmark(sys.argv[2] if len(sys.argv) > 2 else 'resolve')
+    else:
+        asyncio.run(demo_synchroniser_agent())
@@ -4,14 +4,65 @@ DexScreener API Integration
 Handles DEX pair discovery, trending pairs, and market data
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import httpx
 import asyncio
+import time
+import numpy as np
 from datetime import datetime, timedelta
 import logging
 
+try:
+    import h2  # httpx only negotiates HTTP/2 when h2 is installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# DexScreener chain ids the trending index may be built for
+TRENDING_CHAINS = (
+    "ethereum", "solana", "bsc", "base", "arbitrum", "polygon",
+    "avalanche", "optimism", "fantom", "sui", "ton", "tron",
+)
+
+
+class TokenBucket:
+    """
+    Async token bucket for one endpoint class
+    
+    Callers queue in acquire() until a token is available instead of
+    sending a request that would be answered with 429.
+    """
+    
+    def __init__(self, rate_per_minute: int, burst: Optional[int] = None):
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.capacity = burst or max(1, rate_per_minute // 10)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.waiting = 0
+        self._lock = asyncio.Lock()  # hands tokens out in arrival order
+    
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+    
+    async def acquire(self) -> float:
+        """Wait for a token; returns the time spent queued in seconds"""
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                self._refill()
+                if self.tokens < 1:
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+                    self._refill()
+                self.tokens -= 1
+        finally:
+            self.waiting -= 1
+        return time.monotonic() - started
+
 
 class DexScreenerClient:
     """Client for DexScreener official REST API"""
@@ -25,9 +76,97 @@ class DexScreenerClient:
         "tokens": 60,      # req/min
     }
     
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, max_connections: int = 20):
         self.timeout = timeout
+        self.max_connections = max_connections
         self.last_requests = {}
+        
+        # One bucket per endpoint class, sized from RATE_LIMITS
+        self.buckets = {
+            endpoint: TokenBucket(rate)
+            for endpoint, rate in self.RATE_LIMITS.items()
+        }
+        self.metrics = {
+            endpoint: {
+                "requests": 0,
+                "errors": 0,
+                "total_latency": 0.0,
+                "max_latency": 0.0,
+                "total_wait": 0.0,
+                "max_queue_depth": 0,
+            }
+            for endpoint in self.RATE_LIMITS
+        }
+        
+        # Shared keep-alive pool, created lazily inside the running loop
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.BASE_URL,
+                http2=HTTP2_AVAILABLE,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _get(self, endpoint: str, path: str, params: Optional[Dict] = None) -> httpx.Response:
+        """
+        Rate-limited GET on the shared client
+        
+        Waits for a token from the endpoint's bucket, then records queue
+        wait, queue depth and request latency.
+        """
+        bucket = self.buckets[endpoint]
+        stats = self.metrics[endpoint]
+        stats["max_queue_depth"] = max(stats["max_queue_depth"], bucket.waiting + 1)
+        stats["total_wait"] += await bucket.acquire()
+        
+        started = time.monotonic()
+        self.last_requests[endpoint] = time.time()
+        try:
+            return await self._get_client().get(path, params=params)
+        except httpx.HTTPError:
+            stats["errors"] += 1
+            raise
+        finally:
+            latency = time.monotonic() - started
+            stats["requests"] += 1
+            stats["total_latency"] += latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+    
+    def get_metrics(self) -> Dict:
+        """Per-endpoint latency and rate-limit queue metrics"""
+        endpoints = {}
+        for endpoint, stats in self.metrics.items():
+            requests = stats["requests"]
+            bucket = self.buckets[endpoint]
+            endpoints[endpoint] = {
+                "requests": requests,
+                "errors": stats["errors"],
+                "avg_latency_ms": round(stats["total_latency"] / requests * 1000, 2) if requests else 0.0,
+                "max_latency_ms": round(stats["max_latency"] * 1000, 2),
+                "avg_queue_wait_ms": round(stats["total_wait"] / requests * 1000, 2) if requests else 0.0,
+                "queue_depth": bucket.waiting,
+                "max_queue_depth": stats["max_queue_depth"],
+                "rate_limit_per_min": self.RATE_LIMITS[endpoint],
+            }
+        
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "pool_open": self._client is not None and not self._client.is_closed,
+            "endpoints": endpoints,
+        }
     
     async def search_pairs(self, query: str, chains: Optional[List[str]] = None) -> Dict:
         """
@@ -41,56 +180,55 @@ class DexScreenerClient:
             List of matching pairs with metadata
         """
         
-        url = f"{self.BASE_URL}/latest/dex/search"
+        path = "/latest/dex/search"
         params = {"q": query}
         
         if chains:
             params["chains"] = ",".join(chains)
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, params=params, timeout=self.timeout)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                # Transform DexScreener format to our format
-                pairs = []
-                for pair in data.get("pairs", []):
-                    pairs.append({
-                        "pair_id": pair.get("pairAddress"),
-                        "chain": pair.get("chainId"),
-                        "dex": pair.get("dexId"),
-                        "base_token": {
-                            "address": pair.get("baseToken", {}).get("address"),
-                            "name": pair.get("baseToken", {}).get("name"),
-                            "symbol": pair.get("baseToken", {}).get("symbol"),
-                        },
-                        "quote_token": {
-                            "address": pair.get("quoteToken", {}).get("address"),
-                            "symbol": pair.get("quoteToken", {}).get("symbol"),
-                        },
-                        "price_usd": float(pair.get("priceUsd", 0)),
-                        "liquidity_usd": float(pair.get("liquidity", {}).get("usd", 0)),
-                        "volume_24h_usd": float(pair.get("volume", {}).get("h24", 0)),
-                        "price_change_24h": float(pair.get("priceChange", {}).get("h24", 0)),
-                        "transactions_24h": pair.get("txns", {}).get("h24", {}),
-                        "market_cap": float(pair.get("marketCap", 0)) if pair.get("marketCap") else None,
-                        "fdv": float(pair.get("fdv", 0)) if pair.get("fdv") else None,
-                    })
-                
-                return {
-                    "status": "success",
-                    "total": len(pairs),
-                    "pairs": pairs
-                }
-                
-            except httpx.HTTPError as e:
-                logger.error(f"DexScreener search error: {e}")
-                return {
-                    "status": "error",
-                    "error": f"Failed to search pairs: {str(e)}"
-                }
+        try:
+            response = await self._get("search", path, params=params)
+            response.raise_for_status()
+            
+            data = response.json()
+            
+            # Transform DexScreener format to our format
+            pairs = []
+            for pair in data.get("pairs", []):
+                pairs.append({
+                    "pair_id": pair.get("pairAddress"),
+                    "chain": pair.get("chainId"),
+                    "dex": pair.get("dexId"),
+                    "base_token": {
+                        "address": pair.get("baseToken", {}).get("address"),
+                        "name": pair.get("baseToken", {}).get("name"),
+                        "symbol": pair.get("baseToken", {}).get("symbol"),
+                    },
+                    "quote_token": {
+                        "address": pair.get("quoteToken", {}).get("address"),
+                        "symbol": pair.get("quoteToken", {}).get("symbol"),
+                    },
+                    "price_usd": float(pair.get("priceUsd", 0)),
+                    "liquidity_usd": float(pair.get("liquidity", {}).get("usd", 0)),
+                    "volume_24h_usd": float(pair.get("volume", {}).get("h24", 0)),
+                    "price_change_24h": float(pair.get("priceChange", {}).get("h24", 0)),
+                    "transactions_24h": pair.get("txns", {}).get("h24", {}),
+                    "market_cap": float(pair.get("marketCap", 0)) if pair.get("marketCap") else None,
+                    "fdv": float(pair.get("fdv", 0)) if pair.get("fdv") else None,
+                })
+            
+            return {
+                "status": "success",
+                "total": len(pairs),
+                "pairs": pairs
+            }
+            
+        except httpx.HTTPError as e:
+            logger.error(f"DexScreener search error: {e}")
+            return {
+                "status": "error",
+                "error": f"Failed to search pairs: {str(e)}"
+            }
     
     async def get_pair(self, chain: str, pair_address: str) -> Dict:
         """
@@ -104,73 +242,72 @@ class DexScreenerClient:
             Detailed pair information
         """
         
-        url = f"{self.BASE_URL}/latest/dex/pairs/{chain}/{pair_address}"
+        path = f"/latest/dex/pairs/{chain}/{pair_address}"
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, timeout=self.timeout)
-                response.raise_for_status()
-                
-                data = response.json()
-                pair = data.get("pair")
-                
-                if not pair:
-                    return {"status": "error", "error": "Pair not found"}
-                
-                return {
-                    "status": "success",
-                    "pair": {
-                        "pair_id": pair.get("pairAddress"),
-                        "chain": pair.get("chainId"),
-                        "dex": pair.get("dexId"),
-                        "base_token": {
-                            "address": pair.get("baseToken", {}).get("address"),
-                            "name": pair.get("baseToken", {}).get("name"),
-                            "symbol": pair.get("baseToken", {}).get("symbol"),
-                            "decimals": pair.get("baseToken", {}).get("decimals"),
-                        },
-                        "quote_token": {
-                            "address": pair.get("quoteToken", {}).get("address"),
-                            "symbol": pair.get("quoteToken", {}).get("symbol"),
-                        },
-                        "price_usd": float(pair.get("priceUsd", 0)),
-                        "price_native": float(pair.get("priceNative", 0)),
-                        "liquidity": {
-                            "usd": float(pair.get("liquidity", {}).get("usd", 0)),
-                            "base": float(pair.get("liquidity", {}).get("base", 0)),
-                            "quote": float(pair.get("liquidity", {}).get("quote", 0)),
-                        },
-                        "volume": {
-                            "h1": float(pair.get("volume", {}).get("h1", 0)),
-                            "h6": float(pair.get("volume", {}).get("h6", 0)),
-                            "h24": float(pair.get("volume", {}).get("h24", 0)),
-                        },
-                        "price_change": {
-                            "m5": float(pair.get("priceChange", {}).get("m5", 0)),
-                            "h1": float(pair.get("priceChange", {}).get("h1", 0)),
-                            "h6": float(pair.get("priceChange", {}).get("h6", 0)),
-                            "h24": float(pair.get("priceChange", {}).get("h24", 0)),
-                        },
-                        "transactions": {
-                            "h1": pair.get("txns", {}).get("h1", {}),
-                            "h6": pair.get("txns", {}).get("h6", {}),
-                            "h24": pair.get("txns", {}).get("h24", {}),
-                        },
-                        "market_cap": float(pair.get("marketCap", 0)) if pair.get("marketCap") else None,
-                        "fdv": float(pair.get("fdv", 0)) if pair.get("fdv") else None,
-                        "website": pair.get("website"),
-                        "twitter": pair.get("twitter"),
-                        "telegram": pair.get("telegram"),
-                        "discord": pair.get("discord"),
-                    }
-                }
-                
-            except httpx.HTTPError as e:
-                logger.error(f"DexScreener pair fetch error: {e}")
-                return {
-                    "status": "error",
-                    "error": f"Failed to fetch pair: {str(e)}"
+        try:
+            response = await self._get("pairs", path)
+            response.raise_for_status()
+            
+            data = response.json()
+            pair = data.get("pair")
+            
+            if not pair:
+                return {"status": "error", "error": "Pair not found"}
+            
+            return {
+                "status": "success",
+                "pair": {
+                    "pair_id": pair.get("pairAddress"),
+                    "chain": pair.get("chainId"),
+                    "dex": pair.get("dexId"),
+                    "base_token": {
+                        "address": pair.get("baseToken", {}).get("address"),
+                        "name": pair.get("baseToken", {}).get("name"),
+                        "symbol": pair.get("baseToken", {}).get("symbol"),
+                        "decimals": pair.get("baseToken", {}).get("decimals"),
+                    },
+                    "quote_token": {
+                        "address": pair.get("quoteToken", {}).get("address"),
+                        "symbol": pair.get("quoteToken", {}).get("symbol"),
+                    },
+                    "price_usd": float(pair.get("priceUsd", 0)),
+                    "price_native": float(pair.get("priceNative", 0)),
+                    "liquidity": {
+                        "usd": float(pair.get("liquidity", {}).get("usd", 0)),
+                        "base": float(pair.get("liquidity", {}).get("base", 0)),
+                        "quote": float(pair.get("liquidity", {}).get("quote", 0)),
+                    },
+                    "volume": {
+                        "h1": float(pair.get("volume", {}).get("h1", 0)),
+                        "h6": float(pair.get("volume", {}).get("h6", 0)),
+                        "h24": float(pair.get("volume", {}).get("h24", 0)),
+                    },
+                    "price_change": {
+                        "m5": float(pair.get("priceChange", {}).get("m5", 0)),
+                        "h1": float(pair.get("priceChange", {}).get("h1", 0)),
+                        "h6": float(pair.get("priceChange", {}).get("h6", 0)),
+                        "h24": float(pair.get("priceChange", {}).get("h24", 0)),
+                    },
+                    "transactions": {
+                        "h1": pair.get("txns", {}).get("h1", {}),
+                        "h6": pair.get("txns", {}).get("h6", {}),
+                        "h24": pair.get("txns", {}).get("h24", {}),
+                    },
+                    "market_cap": float(pair.get("marketCap", 0)) if pair.get("marketCap") else None,
+                    "fdv": float(pair.get("fdv", 0)) if pair.get("fdv") else None,
+                    "website": pair.get("website"),
+                    "twitter": pair.get("twitter"),
+                    "telegram": pair.get("telegram"),
+                    "discord": pair.get("discord"),
                 }
+            }
+            
+        except httpx.HTTPError as e:
+            logger.error(f"DexScreener pair fetch error: {e}")
+            return {
+                "status": "error",
+                "error": f"Failed to fetch pair: {str(e)}"
+            }
     
     async def get_token_pairs(self, chain: str, token_address: str) -> Dict:
         """
@@ -184,47 +321,224 @@ class DexScreenerClient:
             List of all pairs for this token
         """
         
-        url = f"{self.BASE_URL}/token-pairs/v1/{chain}/{token_address}"
+        path = f"/token-pairs/v1/{chain}/{token_address}"
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(url, timeout=self.timeout)
-                response.raise_for_status()
-                
-                data = response.json()
-                
-                pairs = []
-                for pair in data.get("pairs", []):
-                    pairs.append({
-                        "pair_id": pair.get("pairAddress"),
-                        "dex": pair.get("dexId"),
-                        "chain": pair.get("chainId"),
-                        "quote_token": pair.get("quoteToken", {}).get("symbol"),
-                        "price_usd": float(pair.get("priceUsd", 0)),
-                        "liquidity_usd": float(pair.get("liquidity", {}).get("usd", 0)),
-                        "volume_24h": float(pair.get("volume", {}).get("h24", 0)),
-                        "transactions_24h": pair.get("txns", {}).get("h24", {}),
-                    })
-                
-                return {
-                    "status": "success",
-                    "total": len(pairs),
-                    "pairs": pairs
-                }
-                
-            except httpx.HTTPError as e:
-                logger.error(f"DexScreener token pairs error: {e}")
-                return {
-                    "status": "error",
-                    "error": f"Failed to fetch token pairs: {str(e)}"
-                }
+        try:
+            response = await self._get("tokens", path)
+            response.raise_for_status()
+            
+            data = response.json()
+            
+            pairs = []
+            for pair in data.get("pairs", []):
+                pairs.append({
+                    "pair_id": pair.get("pairAddress"),
+                    "dex": pair.get("dexId"),
+                    "chain": pair.get("chainId"),
+                    "quote_token": pair.get("quoteToken", {}).get("symbol"),
+                    "price_usd": float(pair.get("priceUsd", 0)),
+                    "liquidity_usd": float(pair.get("liquidity", {}).get("usd", 0)),
+                    "volume_24h": float(pair.get("volume", {}).get("h24", 0)),
+                    "transactions_24h": pair.get("txns", {}).get("h24", {}),
+                })
+            
+            return {
+                "status": "success",
+                "total": len(pairs),
+                "pairs": pairs
+            }
+            
+        except httpx.HTTPError as e:
+            logger.error(f"DexScreener token pairs error: {e}")
+            return {
+                "status": "error",
+                "error": f"Failed to fetch token pairs: {str(e)}"
+            }
+
+
+class PairIndex:
+    """
+    Columnar index of one chain's pairs, sorted by 24h volume
+    
+    Pairs are upserted by pair_id as refreshes arrive; the filter columns
+    are rebuilt from the records so any threshold combination is answered
+    with one vectorized mask instead of a Python pass over every pair.
+    """
+    
+    def __init__(self, chain: str):
+        self.chain = chain
+        self.records: Dict[str, Dict] = {}
+        self.seen_at: Dict[str, float] = {}
+        self.refreshed_at: Optional[float] = None
+        self._rebuild()
+    
+    def upsert(self, pairs: List[Dict]) -> int:
+        """Insert or replace pairs by pair_id; returns the number of changed rows"""
+        now = time.monotonic()
+        changed = 0
+        for pair in pairs:
+            pair_id = pair.get("pair_id")
+            if not pair_id:
+                continue
+            if self.records.get(pair_id) != pair:
+                self.records[pair_id] = pair
+                changed += 1
+            self.seen_at[pair_id] = now
+        
+        self.refreshed_at = now
+        if changed:
+            self._rebuild()
+        return changed
+    
+    def prune(self, max_age: float) -> int:
+        """Drop pairs not seen in a refresh for max_age seconds"""
+        cutoff = time.monotonic() - max_age
+        stale = [pair_id for pair_id, ts in self.seen_at.items() if ts < cutoff]
+        for pair_id in stale:
+            del self.records[pair_id]
+            del self.seen_at[pair_id]
+        if stale:
+            self._rebuild()
+        return len(stale)
+    
+    def _rebuild(self) -> None:
+        records = list(self.records.values())
+        n = len(records)
+        
+        def column(getter):
+            return np.fromiter((getter(r) for r in records), dtype=np.float64, count=n)
+        
+        volume = column(lambda r: r["volume_24h_usd"])
+        order = np.argsort(-volume, kind="stable")
+        
+        self.ids = np.array([r["pair_id"] for r in records], dtype=object)[order]
+        self.volume = volume[order]
+        self.liquidity = column(lambda r: r["liquidity_usd"])[order]
+        self.transactions = column(
+            lambda r: r["transactions_24h"].get("buys", 0) + r["transactions_24h"].get("sells", 0)
+        )[order]
+        self.abs_change = np.abs(column(lambda r: r["price_change_24h"]))[order]
+    
+    def query(
+        self,
+        min_liquidity: float,
+        min_volume_24h: float,
+        min_transactions: int,
+        price_change_threshold: float,
+        limit: int
+    ) -> Tuple[List[Dict], int]:
+        """Pairs matching all thresholds by volume descending, and the match count"""
+        mask = (
+            (self.liquidity >= min_liquidity)
+            & (self.volume >= min_volume_24h)
+            & (self.transactions >= min_transactions)
+            & (self.abs_change >= price_change_threshold)
+        )
+        matches = np.flatnonzero(mask)
+        return [self.records[pair_id] for pair_id in self.ids[matches[:limit]]], int(matches.size)
+    
+    def get_stats(self) -> Dict:
+        return {
+            "pairs": len(self.records),
+            "age_seconds": round(time.monotonic() - self.refreshed_at, 1) if self.refreshed_at else None,
+        }
 
 
 class TrendingPairsFinder:
-    """Find trending pairs based on configurable criteria"""
+    """
+    Find trending pairs based on configurable criteria
     
-    def __init__(self, client: DexScreenerClient):
+    Only chains in `chains` are indexed. At most `max_tracked` chains are
+    refreshed in the background; past that the least recently requested
+    one is dropped, and a chain not requested for `idle_ttl` seconds stops
+    refreshing and is rebuilt on its next request.
+    """
+    
+    def __init__(
+        self,
+        client: DexScreenerClient,
+        refresh_interval: float = 60.0,
+        max_age: float = 900.0,
+        chains: Tuple[str, ...] = TRENDING_CHAINS,
+        max_tracked: int = 6,
+        idle_ttl: float = 900.0
+    ):
         self.client = client
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age  # seconds a pair stays indexed without being seen
+        self.chains = frozenset(chains)
+        self.max_tracked = max_tracked
+        self.idle_ttl = idle_ttl
+        self.indexes: Dict[str, PairIndex] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.refreshing: Dict[str, asyncio.Task] = {}
+        self.last_requested: Dict[str, float] = {}  # chain -> monotonic time
+    
+    async def refresh(self, chain: str) -> Dict:
+        """Fetch the chain's popular pairs and merge them into its index (single-flight)"""
+        task = self.refreshing.get(chain)
+        if task is None:
+            task = asyncio.ensure_future(self._refresh(chain))
+            self.refreshing[chain] = task
+        return await asyncio.shield(task)
+    
+    async def _refresh(self, chain: str) -> Dict:
+        try:
+            search_result = await self.client.search_pairs("*", [chain])
+            if search_result["status"] == "success":
+                index = self.indexes.setdefault(chain, PairIndex(chain))
+                changed = index.upsert(search_result["pairs"])
+                pruned = index.prune(self.max_age)
+                logger.debug(f"Trending index {chain}: {changed} updated, {pruned} pruned")
+            return search_result
+        finally:
+            self.refreshing.pop(chain, None)
+    
+    def track(self, chain: str) -> None:
+        """Keep the chain's index refreshed in the background"""
+        self.last_requested[chain] = time.monotonic()
+        task = self.tasks.get(chain)
+        if task is None or task.done():
+            while len(self.tasks) >= self.max_tracked:
+                oldest = min(self.tasks, key=lambda c: self.last_requested.get(c, 0.0))
+                logger.info(f"Trending index: tracking limit reached, dropping {oldest}")
+                self.untrack(oldest)
+            self.tasks[chain] = asyncio.create_task(self._refresh_loop(chain))
+    
+    def untrack(self, chain: str) -> None:
+        """Stop refreshing the chain and drop its index"""
+        task = self.tasks.pop(chain, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        self.indexes.pop(chain, None)
+        self.last_requested.pop(chain, None)
+    
+    async def _refresh_loop(self, chain: str) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            if time.monotonic() - self.last_requested.get(chain, 0.0) > self.idle_ttl:
+                logger.debug(f"Trending index {chain} idle, no longer refreshed")
+                self.untrack(chain)
+                return
+            try:
+                result = await self.refresh(chain)
+                if result["status"] != "success":
+                    logger.warning(f"Trending index refresh for {chain} failed: {result.get('error')}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Trending index refresh for {chain} failed: {e}")
+    
+    async def stop(self) -> None:
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.tasks.clear()
+        self.last_requested.clear()
+    
+    def get_stats(self) -> Dict:
+        return {chain: index.get_stats() for chain, index in self.indexes.items()}
     
     async def find_trending(
         self,
@@ -238,6 +552,10 @@ class TrendingPairsFinder:
         """
         Find trending pairs matching criteria
         
+        Answered from the chain's in-memory index; only the first request
+        for a chain waits on DexScreener, after which the index is kept
+        fresh in the background.
+        
         Args:
             chain: Blockchain to search
             min_liquidity: Minimum liquidity in USD
@@ -250,42 +568,31 @@ class TrendingPairsFinder:
             Sorted list of trending pairs
         """
         
-        # Search for pairs (using wildcard to get popular ones)
-        search_result = await self.client.search_pairs("*", [chain])
+        if chain not in self.chains:
+            return {"status": "error", "error": f"Unsupported chain: {chain}"}
         
-        if search_result["status"] != "success":
-            return search_result
+        if chain not in self.indexes:
+            search_result = await self.refresh(chain)
+            if search_result["status"] != "success":
+                return search_result
         
-        trending = []
+        self.track(chain)
+        index = self.indexes[chain]
         
-        for pair in search_result["pairs"]:
-            # Apply filters
-            if pair["liquidity_usd"] < min_liquidity:
-                continue
-            if pair["volume_24h_usd"] < min_volume_24h:
-                continue
-            
-            txns_24h = pair["transactions_24h"]
-            if (txns_24h.get("buys", 0) + txns_24h.get("sells", 0)) < min_transactions:
-                continue
-            
-            if abs(pair["price_change_24h"]) < price_change_threshold:
-                continue
-            
-            trending.append(pair)
-        
-        # Sort by volume descending
-        trending = sorted(trending, key=lambda x: x["volume_24h_usd"], reverse=True)
+        trending, total = index.query(
+            min_liquidity, min_volume_24h, min_transactions, price_change_threshold, limit
+        )
         
         return {
             "status": "success",
-            "total": len(trending),
-            "trending": trending[:limit],
+            "total": total,
+            "trending": trending,
             "filters": {
                 "chain": chain,
                 "min_liquidity": min_liquidity,
                 "min_volume_24h": min_volume_24h,
                 "min_transactions": min_transactions,
                 "price_change_threshold": price_change_threshold,
-            }
+            },
+            "index": index.get_stats()
         }
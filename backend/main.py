@@ -43,7 +43,7 @@ The following code is preserved for reference only. All functionality has been m
 See server/api/dex-screener.ts for the current implementation.
 """
 
-# import logging
+import logging
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter
@@ -51,9 +51,12 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import httpx
 from functools import lru_cache
-from typing import Optional, List
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, List
 from datetime import datetime, timedelta
 import asyncio
+import json
+import time
 
 from integrations.dexscreener_integration import DexScreenerClient, TrendingPairsFinder
 
@@ -93,35 +96,189 @@ app.add_middleware(
 dex_client = DexScreenerClient(timeout=15)
 trending_finder = TrendingPairsFinder(dex_client)
 
-# Simple in-memory cache for responses
+# Bounded in-memory cache for responses
 class ResponseCache:
-    def __init__(self, ttl_seconds: int = 300):
+    """
+    LRU response cache bounded by entry count and approximate bytes
+    
+    TTLs are looked up per route from the key prefix ("trending:...").
+    Entries past their TTL but inside the stale window are served as-is
+    while one background task reloads them (stale-while-revalidate), and
+    concurrent misses for a key share a single upstream load.
+    """
+    
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        route_ttls: Optional[Dict[str, int]] = None,
+        stale_seconds: Optional[int] = None,
+        max_entries: int = 1000,
+        max_bytes: int = 32 * 1024 * 1024
+    ):
         self.ttl_seconds = ttl_seconds
-        self.cache = {}
+        self.route_ttls = route_ttls or {}
+        self.stale_seconds = stale_seconds  # None = same as the route TTL
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        
+        # key -> (value, stored_at, size_bytes), least recently used first
+        self.cache: OrderedDict = OrderedDict()
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.bytes = 0
+        
+        # Counters
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.errors = 0
+    
+    def ttl_for(self, key: str) -> int:
+        return self.route_ttls.get(key.split(":", 1)[0], self.ttl_seconds)
+    
+    def _stale_for(self, key: str) -> int:
+        return self.ttl_for(key) if self.stale_seconds is None else self.stale_seconds
+    
+    def _delete(self, key: str) -> None:
+        _, _, size = self.cache.pop(key)
+        self.bytes -= size
     
     def get(self, key: str):
+        """Return a fresh cached value or None"""
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        
+        value, stored_at, _ = entry
+        if time.monotonic() - stored_at >= self.ttl_for(key):
+            return None
+        
+        self.cache.move_to_end(key)
+        logger.debug(f"Cache HIT: {key}")
+        return value
+    
+    def set(self, key: str, value):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            logger.debug(f"Cache SKIP (too large): {key}")
+            return
+        
         if key in self.cache:
-            value, timestamp = self.cache[key]
-            if datetime.now().timestamp() - timestamp < self.ttl_seconds:
-                logger.info(f"Cache HIT: {key}")
+            self._delete(key)
+        self.cache[key] = (value, time.monotonic(), size)
+        self.bytes += size
+        
+        while len(self.cache) > self.max_entries or self.bytes > self.max_bytes:
+            evicted, _ = next(iter(self.cache.items()))
+            self._delete(evicted)
+            self.evictions += 1
+        
+        logger.debug(f"Cache SET: {key} ({size} bytes)")
+    
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[Any]]):
+        """
+        Return the cached response for key, loading it at most once
+        
+        Fresh entries are returned directly; stale entries are returned
+        immediately and refreshed in the background; misses wait on a
+        shared load. Error responses are returned but not cached.
+        """
+        entry = self.cache.get(key)
+        if entry is not None:
+            value, stored_at, _ = entry
+            age = time.monotonic() - stored_at
+            ttl = self.ttl_for(key)
+            
+            if age < ttl:
+                self.hits += 1
+                self.cache.move_to_end(key)
+                logger.debug(f"Cache HIT: {key}")
+                return value
+            
+            if age < ttl + self._stale_for(key):
+                self.stale_hits += 1
+                self.cache.move_to_end(key)
+                if key not in self.in_flight:
+                    self.refreshes += 1
+                    self._start_load(key, load)
+                logger.debug(f"Cache STALE: {key}, refreshing")
                 return value
-            else:
-                del self.cache[key]
-        return None
+            
+            self._delete(key)
+        
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._start_load(key, load)
+        
+        return await asyncio.shield(task)
     
-    def set(self, key: str, value):
-        self.cache[key] = (value, datetime.now().timestamp())
-        logger.info(f"Cache SET: {key}")
+    def _start_load(self, key: str, load: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._load(key, load))
+        task.add_done_callback(self._load_done)
+        self.in_flight[key] = task
+        return task
+    
+    async def _load(self, key: str, load: Callable[[], Awaitable[Any]]):
+        try:
+            value = await load()
+            if not (isinstance(value, dict) and value.get("status") == "error"):
+                self.set(key, value)
+            return value
+        finally:
+            self.in_flight.pop(key, None)
+    
+    def _load_done(self, task: asyncio.Task) -> None:
+        # Retrieve the exception so background refresh failures are counted, not lost
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+            logger.warning(f"Cache load failed: {task.exception()}")
     
     def clear_expired(self):
-        """Remove expired entries"""
-        now = datetime.now().timestamp()
-        expired = [k for k, (v, ts) in self.cache.items() 
-                   if now - ts > self.ttl_seconds]
+        """Remove entries past their TTL and stale window"""
+        now = time.monotonic()
+        expired = [k for k, (v, ts, size) in self.cache.items()
+                   if now - ts >= self.ttl_for(k) + self._stale_for(k)]
         for k in expired:
-            del self.cache[k]
+            self._delete(k)
+    
+    def clear(self):
+        self.cache.clear()
+        self.bytes = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "cached_items": len(self.cache),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.stale_hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "in_flight": len(self.in_flight),
+            "ttl_seconds": self.ttl_seconds,
+            "route_ttls": self.route_ttls,
+        }
 
-response_cache = ResponseCache(ttl_seconds=300)  # 5 minute TTL
+# Per-route TTLs, keyed by cache key prefix
+CACHE_ROUTE_TTLS = {
+    "search_pairs": 120,
+    "pair": 30,
+    "token_pairs": 120,
+    "trending": 300,
+}
+
+response_cache = ResponseCache(ttl_seconds=300, route_ttls=CACHE_ROUTE_TTLS)  # 5 minute default TTL
 
 # ============= HEALTH CHECK =============
 
@@ -159,18 +316,12 @@ async def search_pairs(
     try:
         # Check cache
         cache_key = f"search_pairs:{q}:{chains}"
-        cached = response_cache.get(cache_key)
-        if cached:
-            return cached
-        
         chains_list = [c.strip() for c in chains.split(",")] if chains else None
         
-        result = await dex_client.search_pairs(q, chains_list)
-        
-        # Cache result
-        response_cache.set(cache_key, result)
-        
-        return result
+        return await response_cache.get_or_load(
+            cache_key,
+            lambda: dex_client.search_pairs(q, chains_list)
+        )
     
     except Exception as e:
         logger.error(f"Error searching pairs: {e}")
@@ -199,16 +350,10 @@ async def get_pair(
     try:
         # Check cache
         cache_key = f"pair:{chain}:{pair_address}"
-        cached = response_cache.get(cache_key)
-        if cached:
-            return cached
-        
-        result = await dex_client.get_pair(chain, pair_address)
-        
-        # Cache result
-        response_cache.set(cache_key, result)
-        
-        return result
+        return await response_cache.get_or_load(
+            cache_key,
+            lambda: dex_client.get_pair(chain, pair_address)
+        )
     
     except Exception as e:
         logger.error(f"Error getting pair {chain}/{pair_address}: {e}")
@@ -237,16 +382,10 @@ async def get_token_pairs(
     try:
         # Check cache
         cache_key = f"token_pairs:{chain}:{token_address}"
-        cached = response_cache.get(cache_key)
-        if cached:
-            return cached
-        
-        result = await dex_client.get_token_pairs(chain, token_address)
-        
-        # Cache result
-        response_cache.set(cache_key, result)
-        
-        return result
+        return await response_cache.get_or_load(
+            cache_key,
+            lambda: dex_client.get_token_pairs(chain, token_address)
+        )
     
     except Exception as e:
         logger.error(f"Error getting token pairs {chain}/{token_address}: {e}")
@@ -286,26 +425,27 @@ async def find_trending_pairs(
     Returns:
         Sorted list of trending pairs
     """
+    if chain not in trending_finder.chains:
+        raise HTTPException(status_code=400, detail=f"Unsupported chain: {chain}")
+    
     try:
         # Check cache
-        cache_key = f"trending:{chain}:{min_liquidity}:{min_volume_24h}:{limit}"
-        cached = response_cache.get(cache_key)
-        if cached:
-            return cached
-        
-        result = await trending_finder.find_trending(
-            chain=chain,
-            min_liquidity=min_liquidity,
-            min_volume_24h=min_volume_24h,
-            min_transactions=min_transactions,
-            price_change_threshold=price_change_threshold,
-            limit=limit
+        # Stale lists are served immediately and refreshed in the background
+        cache_key = (
+            f"trending:{chain}:{min_liquidity}:{min_volume_24h}:"
+            f"{min_transactions}:{price_change_threshold}:{limit}"
+        )
+        return await response_cache.get_or_load(
+            cache_key,
+            lambda: trending_finder.find_trending(
+                chain=chain,
+                min_liquidity=min_liquidity,
+                min_volume_24h=min_volume_24h,
+                min_transactions=min_transactions,
+                price_change_threshold=price_change_threshold,
+                limit=limit
+            )
         )
-        
-        # Cache result
-        response_cache.set(cache_key, result)
-        
-        return result
     
     except Exception as e:
         logger.error(f"Error finding trending pairs: {e}")
@@ -353,7 +493,7 @@ async def sync_symbol_universe(request=None):
 @app.delete("/api/cache/clear")
 async def clear_cache():
     """Clear all cached responses"""
-    response_cache.cache.clear()
+    response_cache.clear()
     return {
         "status": "success",
         "message": "All caches cleared",
@@ -365,8 +505,16 @@ async def cache_stats():
     """Get cache statistics"""
     response_cache.clear_expired()
     return {
-        "cached_items": len(response_cache.cache),
-        "ttl_seconds": response_cache.ttl_seconds,
+        **response_cache.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/dex/client-metrics")
+async def dex_client_metrics():
+    """DexScreener client latency and rate-limit queue metrics"""
+    return {
+        **dex_client.get_metrics(),
+        "trending_index": trending_finder.get_stats(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -389,10 +537,15 @@ async def startup_event():
     logger.info("Services:")
     logger.info("  ✓ DexScreener API Integration")
     logger.info("  ✓ Symbol Universe Discovery")
-    logger.info("  ✓ Response Caching (5 min TTL)")
+    logger.info("  ✓ Response Caching (LRU, per-route TTL, stale-while-revalidate)")
     logger.info("  ✓ Rate Limiting")
     logger.info("=" * 60)
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await trending_finder.stop()
+    await dex_client.aclose()
+
 # ============= RUN =============
 
 if __name__ == "__main__":
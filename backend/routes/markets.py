@@ -6,13 +6,45 @@ Aggregates prices from CEX + DEX
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from models import get_db, OHLCV
+from models import get_db
 from services.market_aggregator import MarketAggregator
+from services.arbitrage import ArbitrageEngine, ArbitrageScanner
+from services.ohlcv_reader import fetch_candles, serialize_columns, serialize_rows, window_stats
 from datetime import datetime, timedelta
 import asyncio
+import os
 
 router = APIRouter(prefix="/api/yuki/markets", tags=["markets"])
 aggregator = MarketAggregator()
+arbitrage_engine = ArbitrageEngine()
+arbitrage_scanner = ArbitrageScanner(aggregator, arbitrage_engine)
+
+# Set MARKET_STREAMING=1 to serve pairs from websocket order-book streams
+MARKET_STREAMING = os.getenv("MARKET_STREAMING", "0") == "1"
+# Pairs allowed to stream (empty: any BASE/QUOTE pair), how many at once,
+# and how long an unrequested pair keeps its streams
+MARKET_STREAM_PAIRS = [p.strip() for p in os.getenv("MARKET_STREAM_PAIRS", "").split(",") if p.strip()]
+MARKET_STREAM_MAX_PAIRS = int(os.getenv("MARKET_STREAM_MAX_PAIRS", "50"))
+MARKET_STREAM_IDLE_SECONDS = float(os.getenv("MARKET_STREAM_IDLE_SECONDS", "300"))
+
+# Comma-separated pair universe scanned continuously for arbitrage
+ARBITRAGE_SCAN_PAIRS = [p.strip() for p in os.getenv("ARBITRAGE_SCAN_PAIRS", "").split(",") if p.strip()]
+
+@router.on_event("startup")
+async def start_market_streams():
+    if MARKET_STREAMING:
+        aggregator.enable_streaming(
+            allowed_pairs=MARKET_STREAM_PAIRS,
+            max_pairs=MARKET_STREAM_MAX_PAIRS,
+            idle_ttl=MARKET_STREAM_IDLE_SECONDS
+        )
+    if ARBITRAGE_SCAN_PAIRS:
+        arbitrage_scanner.start(ARBITRAGE_SCAN_PAIRS)
+
+@router.on_event("shutdown")
+async def stop_market_streams():
+    await arbitrage_scanner.stop()
+    await aggregator.disable_streaming()
 
 # ============================================================================
 # MARKET SEARCH & AGGREGATION
@@ -47,6 +79,45 @@ async def search_pair(q: str, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# ============================================================================
+# BATCH MARKET DATA (Watchlists)
+# ============================================================================
+
+MAX_BATCH_PAIRS = 500
+
+@router.get("/batch")
+async def get_batch_market_data(
+    pairs: str = Query(..., description="Comma-separated pairs, e.g. BTC/USDT,ETH/USDT"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get aggregated pricing for many pairs in one request
+    
+    GET /api/yuki/markets/batch?pairs=BTC/USDT,ETH/USDT,SOL/USDT
+    """
+    pair_list = [p.strip() for p in pairs.split(",") if p.strip()]
+    
+    if not pair_list:
+        raise HTTPException(status_code=400, detail="No pairs given")
+    if len(pair_list) > MAX_BATCH_PAIRS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_PAIRS} pairs per request")
+    
+    try:
+        market_data = await aggregator.get_many_pairs_market_data(pair_list)
+        
+        return {
+            'status': 'success',
+            'timestamp': market_data['timestamp'],
+            'total_pairs': len(market_data['pairs']),
+            'venues_answered': market_data['venues_answered'],
+            'pairs': {
+                pair: data['aggregate']
+                for pair, data in market_data['pairs'].items()
+            }
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # ============================================================================
 # PAIR DETAIL VIEW (All Sources)
 # ============================================================================
@@ -98,6 +169,62 @@ async def get_pair_detail(pair: str, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# ============================================================================
+# QUOTE CACHE STATS
+# ============================================================================
+
+@router.get("/cache/stats")
+async def get_quote_cache_stats():
+    """
+    Get quote cache hit/miss/coalesce counters
+    
+    GET /api/yuki/markets/cache/stats
+    """
+    return {
+        'status': 'success',
+        'quote_cache': aggregator.get_cache_stats()
+    }
+
+# ============================================================================
+# LIVE ORDER-BOOK STREAMS
+# ============================================================================
+
+@router.post("/stream/subscribe")
+async def subscribe_pairs(
+    pairs: str = Query(..., description="Comma-separated pairs to stream, e.g. BTC/USDT,ETH/USDT")
+):
+    """
+    Pre-subscribe pairs so their first request is served from live books
+    
+    POST /api/yuki/markets/stream/subscribe?pairs=BTC/USDT,ETH/USDT
+    """
+    if aggregator.subscriptions is None:
+        raise HTTPException(status_code=409, detail="Market streaming is disabled")
+    
+    pair_list = [p.strip() for p in pairs.split(",") if p.strip()]
+    subscribed = [pair for pair in pair_list if aggregator.subscriptions.subscribe(pair)]
+    
+    return {
+        'status': 'success',
+        'subscribed': subscribed,
+        'rejected': [pair for pair in pair_list if pair not in subscribed]
+    }
+
+@router.get("/stream/status")
+async def get_stream_status():
+    """
+    Get live stream and book store status
+    
+    GET /api/yuki/markets/stream/status
+    """
+    if aggregator.subscriptions is None:
+        return {'status': 'disabled'}
+    
+    return {
+        'status': 'success',
+        'streams': aggregator.subscriptions.get_status()
+    }
+
 # ============================================================================
 # OHLCV HISTORICAL DATA (For Charts & Backtesting)
 # ============================================================================
@@ -107,40 +234,32 @@ async def get_ohlcv(
     pair: str,
     timeframe: str = Query("1h", description="1m, 5m, 15m, 1h, 4h, 1d"),
     limit: int = Query(100, ge=1, le=1000),
+    layout: str = Query("rows", description="rows (list of candles) or columns (one array per field)"),
     db: Session = Depends(get_db)
 ):
     """
     Get historical OHLCV data for a pair
     
     GET /api/yuki/markets/ohlcv/BTC/USDT?timeframe=1h&limit=100
+    GET /api/yuki/markets/ohlcv/BTC/USDT?timeframe=1h&limit=1000&layout=columns
     """
     
-    candles = db.query(OHLCV).filter(
-        OHLCV.pair == pair,
-        OHLCV.timeframe == timeframe
-    ).order_by(OHLCV.timestamp.desc()).limit(limit).all()
+    if layout not in ('rows', 'columns'):
+        raise HTTPException(status_code=400, detail="layout must be 'rows' or 'columns'")
     
-    if not candles:
-        raise HTTPException(status_code=404, detail=f"No OHLCV data for {pair}")
+    # Chronological, float-cast columns fetched in one narrow query
+    candles = fetch_candles(db, pair, timeframe, limit)
     
-    # Reverse to get chronological order
-    candles = list(reversed(candles))
+    if candles is None:
+        raise HTTPException(status_code=404, detail=f"No OHLCV data for {pair}")
     
     return {
         'status': 'success',
         'pair': pair,
         'timeframe': timeframe,
-        'total_candles': len(candles),
-        'data': [{
-            'timestamp': c.timestamp.isoformat(),
-            'open': float(c.open_price),
-            'high': float(c.high_price),
-            'low': float(c.low_price),
-            'close': float(c.close_price),
-            'volume': float(c.volume),
-            'volume_quote': float(c.volume_quote),
-            'trades': c.trades_count
-        } for c in candles]
+        'total_candles': len(candles['timestamp']),
+        'layout': layout,
+        'data': serialize_columns(candles) if layout == 'columns' else serialize_rows(candles)
     }
 
 # ============================================================================
@@ -223,44 +342,42 @@ async def detect_arbitrage(
     
     try:
         market_data = await aggregator.get_pair_market_data(pair)
-        sources = market_data['aggregate']['sources']
         
-        opportunities = []
-        
-        # Check all buy/sell combinations
-        for buy_source in sources:
-            for sell_source in sources:
-                if buy_source['exchange'] == sell_source['exchange']:
-                    continue
-                
-                profit_per_unit = sell_source['price'] - buy_source['price']
-                profit_pct = (profit_per_unit / buy_source['price']) * 100
-                
-                if profit_pct > 0.1:  # Only show > 0.1% profit
-                    opportunities.append({
-                        'buy_exchange': buy_source['exchange'],
-                        'buy_price': buy_source['price'],
-                        'sell_exchange': sell_source['exchange'],
-                        'sell_price': sell_source['price'],
-                        'profit_per_unit': round(profit_per_unit, 2),
-                        'profit_pct': round(profit_pct, 4),
-                        'estimated_slippage_usd': size_usd * 0.005,  # Estimate 0.5% slippage
-                        'net_profit_usd': (profit_per_unit / buy_source['price']) * size_usd - (size_usd * 0.005),
-                        'viable': (profit_per_unit / buy_source['price']) * size_usd > (size_usd * 0.005)
-                    })
-        
-        # Sort by profit descending
-        opportunities.sort(key=lambda x: x['net_profit_usd'], reverse=True)
+        # Book walking sizes every venue by real depth, so thin venues are
+        # kept rather than dropped by the aggregate liquidity filter
+        sources = market_data['cex_sources'] + market_data['dex_sources']
+        opportunities = arbitrage_engine.find_opportunities(sources, size_usd, limit=5)
         
         return {
             'status': 'success',
             'pair': pair,
             'size_usd': size_usd,
-            'opportunities': opportunities[:5]  # Top 5
+            'opportunities': opportunities  # Top 5
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/arbitrage")
+async def get_arbitrage_universe(
+    limit: int = Query(20, ge=1, le=200),
+    viable_only: bool = Query(False, description="Only opportunities with positive net profit")
+):
+    """
+    Best arbitrage opportunities across the continuously scanned pair universe
+    
+    GET /api/yuki/markets/arbitrage?limit=20&viable_only=true
+    """
+    if arbitrage_scanner.task is None:
+        raise HTTPException(status_code=409, detail="Arbitrage scanner is not running")
+    
+    return {
+        'status': 'success',
+        'pairs_scanned': len(arbitrage_scanner.pairs),
+        'size_usd': arbitrage_scanner.size_usd,
+        'last_scan_at': arbitrage_scanner.last_scan_at,
+        'opportunities': arbitrage_scanner.top_opportunities(limit, viable_only)
+    }
+
 # ============================================================================
 # PAIR STATISTICS
 # ============================================================================
@@ -285,27 +402,21 @@ async def get_pair_stats(pair: str, period: str = "24h", db: Session = Depends(g
     
     cutoff = datetime.utcnow() - timedelta(days=days)
     
-    # Query OHLCV data for the period
-    candles = db.query(OHLCV).filter(
-        OHLCV.pair == pair,
-        OHLCV.timestamp >= cutoff
-    ).all()
+    # Aggregated in SQL - no candle rows are loaded
+    stats = window_stats(db, pair, cutoff)
     
-    if not candles:
+    if stats is None:
         raise HTTPException(status_code=404, detail=f"No data for {pair}")
     
-    prices = [float(c.close_price) for c in candles]
-    volumes = [float(c.volume) for c in candles]
-    
     return {
         'status': 'success',
         'pair': pair,
         'period': period,
-        'high': max(prices),
-        'low': min(prices),
-        'open': float(candles[0].open_price),
-        'close': float(candles[-1].close_price),
-        'change_pct': ((float(candles[-1].close_price) - float(candles[0].open_price)) / float(candles[0].open_price)) * 100,
-        'avg_price': sum(prices) / len(prices),
-        'total_volume': sum(volumes)
+        'high': stats['high'],
+        'low': stats['low'],
+        'open': stats['open'],
+        'close': stats['close'],
+        'change_pct': stats['change_pct'],
+        'avg_price': stats['avg_price'],
+        'total_volume': stats['total_volume']
     }
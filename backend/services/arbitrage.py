@@ -0,0 +1,271 @@
+# backend/services/arbitrage.py
+"""
+Cross-venue arbitrage detection
+Sorts venues by ask and bid, then walks real book depth to size each
+opportunity net of per-venue taker fees
+"""
+
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Taker fees as fractions of notional (public base tiers)
+DEFAULT_TAKER_FEES = {
+    'binance': 0.0010,
+    'coinbase': 0.0060,
+    'kraken': 0.0026,
+    'gatedio': 0.0020,
+    'okx': 0.0010,
+    'bybit': 0.0010,
+    'kucoin': 0.0010,
+    'bitget': 0.0010,
+}
+DEFAULT_DEX_FEE = 0.0030  # typical AMM pool fee
+
+
+def venue_id(source: Dict) -> str:
+    """Stable venue name for CEX and DEX sources alike"""
+    if source.get('exchange'):
+        return source['exchange']
+    return f"{source.get('dex', 'dex')}@{source.get('chain', 'unknown')}"
+
+
+def walk_book(levels: List[List[float]], base_qty: Optional[float] = None,
+              notional: Optional[float] = None) -> Tuple[float, float]:
+    """
+    Consume book levels until base_qty or notional is filled
+
+    Returns (filled base quantity, filled notional).
+    """
+    filled_qty = 0.0
+    filled_notional = 0.0
+
+    for price, amount in levels:
+        if base_qty is not None:
+            take = min(amount, base_qty - filled_qty)
+        else:
+            take = min(amount, (notional - filled_notional) / price)
+        if take <= 0:
+            break
+        filled_qty += take
+        filled_notional += take * price
+
+    return filled_qty, filled_notional
+
+
+def _profit_rank(opportunity: Dict) -> Tuple[bool, float]:
+    """Sized opportunities by net profit, then unsized ones by edge"""
+    if opportunity['net_profit_usd'] is None:
+        return False, opportunity['profit_pct']
+    return True, opportunity['net_profit_usd']
+
+
+class ArbitrageEngine:
+    """Size-aware arbitrage scanner for one pair's venue quotes"""
+
+    def __init__(self, taker_fees: Optional[Dict[str, float]] = None,
+                 dex_fee: float = DEFAULT_DEX_FEE, min_profit_pct: float = 0.1):
+        self.taker_fees = dict(DEFAULT_TAKER_FEES, **(taker_fees or {}))
+        self.dex_fee = dex_fee
+        self.min_profit_pct = min_profit_pct  # top-of-book edge to report
+
+    def fee_for(self, source: Dict) -> float:
+        if source.get('type') == 'DEX':
+            return self.dex_fee
+        return self.taker_fees.get(venue_id(source), 0.002)
+
+    @staticmethod
+    def _levels(source: Dict, side: str) -> List[List[Optional[float]]]:
+        """
+        Book levels for one side, best first
+
+        Sources without a book are treated as a single level at their
+        quoted price: DEX pools sized by pool liquidity, bulk tickers by
+        their top-of-book size. A CEX ticker without one gets an unsized
+        level (amount None) - its liquidity_usd is 24h volume, not depth.
+        """
+        levels = source.get(side)
+        if levels:
+            return levels
+
+        top = source.get('ask' if side == 'asks' else 'bid') or source.get('price')
+        if not top:
+            return []
+        if source.get('type') == 'DEX':
+            liquidity = source.get('liquidity_usd')
+            return [[top, liquidity / top]] if liquidity else []
+        return [[top, source.get('ask_size' if side == 'asks' else 'bid_size')]]
+
+    def find_opportunities(self, sources: List[Dict], size_usd: float, limit: int = 5) -> List[Dict]:
+        """
+        Opportunities to buy on one venue and sell on another, best first
+
+        Venues are sorted once by ask (ascending) and bid (descending); the
+        scan stops as soon as the best remaining bid no longer clears the
+        current ask, so only crossing venue pairs are walked.
+        """
+        asks, bids = [], []
+        for source in sources:
+            buy_levels = self._levels(source, 'asks')
+            sell_levels = self._levels(source, 'bids')
+            if buy_levels:
+                asks.append((buy_levels[0][0], source, buy_levels))
+            if sell_levels:
+                bids.append((sell_levels[0][0], source, sell_levels))
+
+        asks.sort(key=lambda x: x[0])
+        bids.sort(key=lambda x: x[0], reverse=True)
+
+        opportunities = []
+        for ask, buy_source, buy_levels in asks:
+            if not bids or bids[0][0] <= ask:
+                break  # no bid left that crosses this (or any higher) ask
+
+            for bid, sell_source, sell_levels in bids:
+                if bid <= ask:
+                    break
+                if venue_id(buy_source) == venue_id(sell_source):
+                    continue
+
+                profit_pct = (bid - ask) / ask * 100
+                if profit_pct <= self.min_profit_pct:
+                    continue
+
+                opportunities.append(self._size_opportunity(
+                    buy_source, buy_levels, sell_source, sell_levels, size_usd
+                ))
+
+        opportunities.sort(key=_profit_rank, reverse=True)
+        return opportunities[:limit]
+
+    def _size_opportunity(self, buy_source: Dict, buy_levels: List, sell_source: Dict,
+                          sell_levels: List, size_usd: float) -> Dict:
+        """Walk both books for size_usd and compute net profit after fees"""
+        top_ask = buy_levels[0][0]
+        top_bid = sell_levels[0][0]
+
+        if buy_levels[0][1] is None or sell_levels[0][1] is None:
+            # A crossing price with no known depth: report it, never size it
+            return {
+                'buy_exchange': venue_id(buy_source),
+                'buy_price': top_ask,
+                'sell_exchange': venue_id(sell_source),
+                'sell_price': top_bid,
+                'profit_per_unit': round(top_bid - top_ask, 2),
+                'profit_pct': round((top_bid - top_ask) / top_ask * 100, 4),
+                'executable_size_usd': None,
+                'base_amount': None,
+                'avg_buy_price': None,
+                'avg_sell_price': None,
+                'fees_usd': None,
+                'estimated_slippage_usd': None,
+                'net_profit_usd': None,
+                'viable': False
+            }
+
+        # Buy up to size_usd, then sell as much of it as the bid side absorbs
+        base_qty, _ = walk_book(buy_levels, notional=size_usd)
+        sold_qty, proceeds = walk_book(sell_levels, base_qty=base_qty)
+        _, cost = walk_book(buy_levels, base_qty=sold_qty)
+
+        buy_fee = cost * self.fee_for(buy_source)
+        sell_fee = proceeds * self.fee_for(sell_source)
+        net_profit = proceeds - cost - buy_fee - sell_fee
+
+        # Price impact versus filling everything at top of book
+        slippage = (cost - sold_qty * top_ask) + (sold_qty * top_bid - proceeds)
+
+        return {
+            'buy_exchange': venue_id(buy_source),
+            'buy_price': top_ask,
+            'sell_exchange': venue_id(sell_source),
+            'sell_price': top_bid,
+            'profit_per_unit': round(top_bid - top_ask, 2),
+            'profit_pct': round((top_bid - top_ask) / top_ask * 100, 4),
+            'executable_size_usd': round(cost, 2),
+            'base_amount': sold_qty,
+            'avg_buy_price': cost / sold_qty if sold_qty else None,
+            'avg_sell_price': proceeds / sold_qty if sold_qty else None,
+            'fees_usd': round(buy_fee + sell_fee, 2),
+            'estimated_slippage_usd': round(slippage, 2),
+            'net_profit_usd': round(net_profit, 2),
+            'viable': net_profit > 0
+        }
+
+
+class ArbitrageScanner:
+    """
+    Continuously scan a pair universe for arbitrage
+
+    Uses streamed books when the aggregator is streaming a pair, and one
+    batched ticker pass for the rest, so a scan cycle costs at most one
+    request per venue.
+    """
+
+    def __init__(self, aggregator, engine: Optional[ArbitrageEngine] = None,
+                 size_usd: float = 10000, interval: float = 2.0):
+        self.aggregator = aggregator
+        self.engine = engine or ArbitrageEngine()
+        self.size_usd = size_usd
+        self.interval = interval
+        self.pairs: List[str] = []
+        self.latest: Dict[str, List[Dict]] = {}
+        self.last_scan_at: Optional[str] = None
+        self.scan_count = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self, pairs: List[str]) -> None:
+        self.pairs = list(dict.fromkeys(pairs))
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._scan_loop())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def scan_once(self) -> None:
+        streamed = {}
+        if self.aggregator.subscriptions is not None:
+            for pair in self.pairs:
+                sources = self.aggregator.get_streamed_sources(pair)
+                if sources:
+                    streamed[pair] = sources
+
+        polled = [pair for pair in self.pairs if pair not in streamed]
+        if polled:
+            batch = await self.aggregator.get_many_pairs_market_data(polled)
+            for pair, data in batch['pairs'].items():
+                streamed[pair] = data['cex_sources'] + data['dex_sources']
+
+        self.latest = {
+            pair: self.engine.find_opportunities(sources, self.size_usd)
+            for pair, sources in streamed.items()
+        }
+        self.last_scan_at = datetime.utcnow().isoformat()
+        self.scan_count += 1
+
+    async def _scan_loop(self) -> None:
+        while True:
+            try:
+                await self.scan_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Arbitrage scan failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def top_opportunities(self, limit: int = 20, viable_only: bool = False) -> List[Dict]:
+        """Best opportunities across the whole universe"""
+        ranked = [
+            dict(opportunity, pair=pair)
+            for pair, opportunities in self.latest.items()
+            for opportunity in opportunities
+            if opportunity['viable'] or not viable_only
+        ]
+        ranked.sort(key=_profit_rank, reverse=True)
+        return ranked[:limit]
@@ -0,0 +1,312 @@
+# backend/services/book_stream.py
+"""
+Streaming order-book subscriptions
+Keeps live L2 books and tickers per venue in memory so market endpoints
+can price a pair without any network calls.
+
+Venues are any client exposing the ccxt.pro streaming interface:
+    await client.watch_order_book(pair, limit)
+    await client.watch_ticker(pair)
+ReplayFeed implements the same interface from recorded frames and can be
+used as a stand-in venue for tests and local development.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import re
+import time
+
+try:
+    import ccxt.pro as ccxtpro
+except ImportError:
+    ccxtpro = None
+
+logger = logging.getLogger(__name__)
+
+# BASE/QUOTE symbols as ccxt spells them, e.g. BTC/USDT or 1INCH/USDC
+PAIR_PATTERN = re.compile(r'^[A-Z0-9]{1,15}/[A-Z0-9]{1,15}$')
+
+
+class OrderBookStore:
+    """In-memory L2 books and tickers keyed by (venue, pair)"""
+
+    def __init__(self, max_age: float = 5.0, depth: int = 20):
+        self.max_age = max_age  # seconds before a book is considered stale
+        self.depth = depth      # levels kept per side
+        self.books: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.tickers: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.updated_at: Dict[Tuple[str, str], float] = {}  # last book update
+        self.ticker_updated_at: Dict[Tuple[str, str], float] = {}
+        self.update_count = 0
+
+    def update_book(self, venue: str, pair: str, bids: List, asks: List) -> None:
+        key = (venue, pair)
+        self.books[key] = {
+            'bids': [[float(p), float(q)] for p, q, *_ in bids[:self.depth]],
+            'asks': [[float(p), float(q)] for p, q, *_ in asks[:self.depth]],
+        }
+        self.updated_at[key] = time.monotonic()
+        self.update_count += 1
+
+    def update_ticker(self, venue: str, pair: str, ticker: Dict[str, Any]) -> None:
+        key = (venue, pair)
+        self.tickers[key] = ticker
+        self.ticker_updated_at[key] = time.monotonic()
+        self.update_count += 1
+
+    def discard(self, pair: str) -> None:
+        """Forget every venue's book and ticker for pair"""
+        for key in [k for k in self.books if k[1] == pair] + [k for k in self.tickers if k[1] == pair]:
+            self.books.pop(key, None)
+            self.tickers.pop(key, None)
+            self.updated_at.pop(key, None)
+            self.ticker_updated_at.pop(key, None)
+
+    def snapshot(self, pair: str, max_age: Optional[float] = None) -> List[Tuple[str, Dict, Dict]]:
+        """(venue, ticker, book) for every venue with a fresh book and a fresh ticker"""
+        max_age = self.max_age if max_age is None else max_age
+        now = time.monotonic()
+        result = []
+
+        for (venue, book_pair), book in self.books.items():
+            if book_pair != pair:
+                continue
+            key = (venue, pair)
+            ticker = self.tickers.get(key)
+            if ticker is None or now - self.updated_at[key] > max_age \
+                    or now - self.ticker_updated_at[key] > max_age:
+                continue
+            result.append((venue, ticker, book))
+
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        fresh = sum(1 for ts in self.updated_at.values() if now - ts <= self.max_age)
+        return {
+            'books': len(self.books),
+            'tickers': len(self.tickers),
+            'fresh': fresh,
+            'updates': self.update_count,
+        }
+
+
+class SubscriptionManager:
+    """
+    Background order-book and ticker streams per venue and pair
+
+    Pairs come from request paths, so only well-formed pairs (and, when
+    `allowed_pairs` is set, only those) are streamed, at most `max_pairs`
+    at a time. A pair not requested for `idle_ttl` seconds is unsubscribed.
+    """
+
+    def __init__(self, store: OrderBookStore, venues: Dict[str, Any],
+                 book_limit: int = 20, max_backoff: float = 30.0,
+                 allowed_pairs: Optional[Iterable[str]] = None,
+                 max_pairs: int = 50, idle_ttl: float = 300.0):
+        self.store = store
+        self.venues = venues
+        self.book_limit = book_limit
+        self.max_backoff = max_backoff
+        self.allowed_pairs = set(allowed_pairs) if allowed_pairs else None
+        self.max_pairs = max_pairs
+        self.idle_ttl = idle_ttl
+        self.tasks: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        self.last_requested: Dict[str, float] = {}  # pair -> monotonic time
+        self.errors: Dict[str, int] = {}
+        self.rejected = 0
+        self._reaper: Optional[asyncio.Task] = None
+
+    def accepts(self, pair: str) -> bool:
+        """Whether pair may be streamed at all"""
+        if self.allowed_pairs is not None:
+            return pair in self.allowed_pairs
+        return PAIR_PATTERN.match(pair) is not None
+
+    def subscribe(self, pair: str) -> bool:
+        """
+        Start book and ticker streams for pair on every venue (idempotent)
+
+        Returns False when the pair is not accepted or max_pairs are
+        already streaming; the caller should poll it instead.
+        """
+        if not self.accepts(pair):
+            self.rejected += 1
+            return False
+        if pair not in self.last_requested:
+            if len(self.last_requested) >= self.max_pairs:
+                self.expire_idle()
+            if len(self.last_requested) >= self.max_pairs:
+                self.rejected += 1
+                return False
+        self.last_requested[pair] = time.monotonic()
+
+        for venue in self.venues:
+            for kind in ('book', 'ticker'):
+                key = (venue, pair, kind)
+                task = self.tasks.get(key)
+                if task is None or task.done():
+                    self.tasks[key] = asyncio.create_task(self._stream(venue, pair, kind))
+
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_idle())
+        return True
+
+    def unsubscribe(self, pair: str) -> None:
+        for key in [k for k in self.tasks if k[1] == pair]:
+            self.tasks.pop(key).cancel()
+        self.last_requested.pop(pair, None)
+        self.store.discard(pair)
+
+    def expire_idle(self) -> List[str]:
+        """Unsubscribe pairs not requested within idle_ttl"""
+        cutoff = time.monotonic() - self.idle_ttl
+        idle = [pair for pair, at in self.last_requested.items() if at < cutoff]
+        for pair in idle:
+            self.unsubscribe(pair)
+        if idle:
+            logger.info(f"Unsubscribed {len(idle)} idle pairs")
+        return idle
+
+    async def _reap_idle(self) -> None:
+        while self.last_requested:
+            await asyncio.sleep(max(1.0, self.idle_ttl / 4))
+            self.expire_idle()
+
+    def is_subscribed(self, pair: str) -> bool:
+        return any(k[1] == pair and not t.done() for k, t in self.tasks.items())
+
+    async def _stream(self, venue: str, pair: str, kind: str) -> None:
+        """Keep one stream alive, reconnecting with exponential backoff"""
+        client = self.venues[venue]
+        backoff = 1.0
+
+        while True:
+            try:
+                if kind == 'book':
+                    book = await client.watch_order_book(pair, self.book_limit)
+                    self.store.update_book(venue, pair, book['bids'], book['asks'])
+                else:
+                    ticker = await client.watch_ticker(pair)
+                    self.store.update_ticker(venue, pair, ticker)
+                backoff = 1.0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors[venue] = self.errors.get(venue, 0) + 1
+                logger.warning(f"{venue} {kind} stream for {pair} failed: {e}, retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def close(self) -> None:
+        """Cancel all streams and close venue clients"""
+        tasks = list(self.tasks.values())
+        if self._reaper is not None:
+            tasks.append(self._reaper)
+            self._reaper = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.tasks.clear()
+        self.last_requested.clear()
+
+        for client in self.venues.values():
+            close = getattr(client, 'close', None)
+            if close is not None:
+                try:
+                    await close()
+                except Exception as e:
+                    logger.warning(f"Error closing stream client: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'venues': list(self.venues),
+            'pairs': sorted({k[1] for k, t in self.tasks.items() if not t.done()}),
+            'streams': sum(1 for t in self.tasks.values() if not t.done()),
+            'max_pairs': self.max_pairs,
+            'rejected': self.rejected,
+            'errors': dict(self.errors),
+            'store': self.store.get_stats(),
+        }
+
+
+class ReplayFeed:
+    """
+    Stand-in venue that replays recorded book/ticker frames
+
+    Each frame is a dict with 'pair' and any of 'bids'/'asks' (book) and
+    'ticker'. Frames are replayed in order per pair, `interval` seconds
+    apart, looping forever when `loop` is set.
+    """
+
+    def __init__(self, frames: List[Dict[str, Any]], interval: float = 0.1, loop: bool = True):
+        self.interval = interval
+        self.loop = loop
+        self.books: Dict[str, List[Dict]] = {}
+        self.tickers: Dict[str, List[Dict]] = {}
+        self.cursors: Dict[Tuple[str, str], int] = {}
+
+        for frame in frames:
+            pair = frame['pair']
+            if 'bids' in frame or 'asks' in frame:
+                self.books.setdefault(pair, []).append({
+                    'bids': frame.get('bids', []),
+                    'asks': frame.get('asks', []),
+                })
+            if 'ticker' in frame:
+                self.tickers.setdefault(pair, []).append(frame['ticker'])
+
+    @classmethod
+    def from_jsonl(cls, path: str, **kwargs) -> 'ReplayFeed':
+        """Load frames from a JSON-lines recording"""
+        with open(path, 'r') as f:
+            frames = [json.loads(line) for line in f if line.strip()]
+        return cls(frames, **kwargs)
+
+    async def _next(self, kind: str, frames: Dict[str, List[Dict]], pair: str) -> Dict:
+        recorded = frames.get(pair)
+        if not recorded:
+            raise ValueError(f"No recorded {kind} frames for {pair}")
+
+        key = (kind, pair)
+        cursor = self.cursors.get(key, 0)
+        if cursor >= len(recorded):
+            if not self.loop:
+                # Recording exhausted - behave like a quiet venue
+                await asyncio.Event().wait()
+            cursor = 0
+
+        # First frame is delivered immediately, like a snapshot on subscribe
+        if key in self.cursors:
+            await asyncio.sleep(self.interval)
+        self.cursors[key] = cursor + 1
+        return recorded[cursor]
+
+    async def watch_order_book(self, pair: str, limit: Optional[int] = None) -> Dict:
+        book = await self._next('book', self.books, pair)
+        if limit:
+            return {'bids': book['bids'][:limit], 'asks': book['asks'][:limit]}
+        return book
+
+    async def watch_ticker(self, pair: str) -> Dict:
+        return await self._next('ticker', self.tickers, pair)
+
+    async def close(self) -> None:
+        pass
+
+
+def create_stream_venues(exchange_names: List[str]) -> Dict[str, Any]:
+    """ccxt.pro websocket clients for the given exchange ids"""
+    if ccxtpro is None:
+        raise RuntimeError("ccxt.pro is not available - install ccxt>=4 for websocket streams")
+
+    venues = {}
+    for name in exchange_names:
+        exchange_class = getattr(ccxtpro, name, None)
+        if exchange_class is None:
+            logger.warning(f"No websocket client for {name}, it will be polled instead")
+            continue
+        venues[name] = exchange_class()
+    return venues
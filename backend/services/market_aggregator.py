@@ -8,10 +8,28 @@ import ccxt
 from typing import List, Dict, Optional
 from decimal import Decimal
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import asyncio
+import logging
+import threading
+
+from services.quote_cache import QuoteCache
+from services.pricing_kernel import QuoteBatch, aggregate_many, aggregate_row, aggregate_sources
+from services.book_stream import OrderBookStore, SubscriptionManager, create_stream_venues
+
+logger = logging.getLogger(__name__)
 
 class MarketAggregator:
-    def __init__(self):
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_calls_per_venue: int = 4,
+        exchange_timeout: float = 5.0,
+        quorum: int = 5,
+        quorum_grace: float = 0.25,
+        quote_ttl: float = 1.0
+    ):
         # Initialize CEX exchanges - 8 major global exchanges
         self.binance = ccxt.binance()
         self.coinbase = ccxt.coinbase()
@@ -32,32 +50,165 @@ class MarketAggregator:
             'kucoin': self.kucoin,
             'bitget': self.bitget
         }
+        
+        # CCXT's sync clients block, so every venue call runs on a pool
+        # instead of the event loop thread. A timed-out call cannot be
+        # cancelled and keeps its thread, so each venue may hold at most
+        # max_calls_per_venue threads and the pool is sized to cover every
+        # venue at that limit: a hung venue is skipped rather than
+        # starving the others of threads.
+        self.max_calls_per_venue = max_calls_per_venue
+        self.venue_calls: Dict[str, int] = {name: 0 for name in self.exchanges}
+        self._venue_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(self.exchanges) * max_calls_per_venue,
+            thread_name_prefix='ccxt-fetch'
+        )
+        self.exchange_timeout = exchange_timeout  # seconds per venue
+        self.quorum = quorum                      # venues to wait for
+        self.quorum_grace = quorum_grace          # extra wait for stragglers once quorum is met
+        
+        # Per-(exchange, pair) quotes shared across requests within quote_ttl
+        self.quote_cache = QuoteCache(ttl_seconds=quote_ttl)
+        
+        # Live books fed by websocket streams (see enable_streaming)
+        self.book_store = OrderBookStore()
+        self.subscriptions: Optional[SubscriptionManager] = None
+    
+    def enable_streaming(
+        self,
+        venues: Optional[Dict] = None,
+        allowed_pairs: Optional[List[str]] = None,
+        max_pairs: int = 50,
+        idle_ttl: float = 300.0
+    ) -> SubscriptionManager:
+        """
+        Start serving pairs from streamed order books
+        
+        Args:
+            venues: name -> streaming client (ccxt.pro interface or
+                ReplayFeed). Defaults to ccxt.pro clients for self.exchanges.
+            allowed_pairs: pairs that may be streamed; any well-formed
+                BASE/QUOTE pair when empty
+            max_pairs: pairs streamed at once; others are polled
+            idle_ttl: seconds without a request before a pair is dropped
+        """
+        if self.subscriptions is None:
+            if venues is None:
+                venues = create_stream_venues(list(self.exchanges))
+            self.subscriptions = SubscriptionManager(
+                self.book_store, venues,
+                allowed_pairs=allowed_pairs, max_pairs=max_pairs, idle_ttl=idle_ttl
+            )
+        return self.subscriptions
+    
+    async def disable_streaming(self) -> None:
+        """Stop all streams"""
+        if self.subscriptions is not None:
+            await self.subscriptions.close()
+            self.subscriptions = None
+    
+    def get_streamed_sources(self, pair: str) -> List[Dict]:
+        """CEX sources built from the live book store - no network calls"""
+        return [
+            self._build_cex_quote(venue, pair, ticker, book)
+            for venue, ticker, book in self.book_store.snapshot(pair)
+        ]
+    
+    def _reserve(self, exchange_name: str, calls: int) -> bool:
+        """Claim pool threads for a venue's calls; False while it is at its limit"""
+        with self._venue_lock:
+            if self.venue_calls[exchange_name] + calls > self.max_calls_per_venue:
+                return False
+            self.venue_calls[exchange_name] += calls
+            return True
     
-    async def get_cex_prices(self, pair: str) -> List[Dict]:
+    def _run_venue_call(self, exchange_name: str, fn):
+        try:
+            return fn()
+        finally:
+            with self._venue_lock:
+                self.venue_calls[exchange_name] -= 1
+    
+    def _submit(self, exchange_name: str, fn, *args, **kwargs) -> asyncio.Future:
+        """Schedule a blocking CCXT call on the fetch pool (after _reserve)"""
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(
+            self.executor,
+            partial(self._run_venue_call, exchange_name, partial(fn, *args, **kwargs))
+        )
+    
+    async def get_cex_prices(
+        self,
+        pair: str,
+        quorum: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> List[Dict]:
         """
-        Fetch prices from all CEX exchanges
+        Fetch prices from all CEX exchanges concurrently
+        
+        Returns as soon as `quorum` venues have answered (plus a short grace
+        period for stragglers), or when `timeout` expires. Venues that have
+        not answered by then are dropped from the result.
         
         Args:
             pair: e.g., 'BTC/USDT'
+            quorum: Venues to wait for (defaults to self.quorum)
+            timeout: Overall deadline in seconds (defaults to self.exchange_timeout)
         
         Returns:
-            List of price data from each exchange
+            List of price data from each exchange that answered in time
         """
+        quorum = min(quorum or self.quorum, len(self.exchanges))
+        timeout = timeout if timeout is not None else self.exchange_timeout
+        
         cex_prices = []
         
-        tasks = [
-            self._fetch_from_exchange(exchange_name, exchange, pair)
+        pending = {
+            asyncio.create_task(self._get_cex_quote(exchange_name, exchange, pair))
             for exchange_name, exchange in self.exchanges.items()
-        ]
+        }
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
         
-        for result in results:
-            if isinstance(result, dict):
-                cex_prices.append(result)
+        try:
+            while pending:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                for task in done:
+                    result = task.result()
+                    if isinstance(result, dict):
+                        cex_prices.append(result)
+                
+                # Quorum reached - give stragglers a short grace period, then stop
+                if len(cex_prices) >= quorum:
+                    deadline = min(deadline, loop.time() + self.quorum_grace)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
         
         return cex_prices
     
+    async def _get_cex_quote(self, exchange_name: str, exchange, pair: str) -> Optional[Dict]:
+        """Cached, coalesced quote for one venue"""
+        return await self.quote_cache.get_or_fetch(
+            (exchange_name, pair),
+            lambda: self._fetch_from_exchange(exchange_name, exchange, pair)
+        )
+    
+    def get_cache_stats(self) -> Dict:
+        """Quote cache hit/miss/coalesce counters"""
+        return self.quote_cache.get_stats()
+    
     async def _fetch_from_exchange(self, exchange_name: str, exchange, pair: str) -> Optional[Dict]:
         """
         Fetch from single exchange
@@ -66,26 +217,113 @@ class MarketAggregator:
         - fetch_ticker(pair): Gets last price, bid, ask, volume
         - fetch_order_book(pair, limit=5): Gets order book depth data
         See: CCXT_API_CALL_MAPPING.md for redundancy analysis & optimization
+        
+        Both calls run concurrently on the fetch pool and share one
+        per-venue timeout.
         """
+        if not self._reserve(exchange_name, 2):
+            logger.warning(f"Skipping {exchange_name}: {self.max_calls_per_venue} calls still running")
+            return None
+        
+        calls = [
+            self._submit(exchange_name, exchange.fetch_ticker, pair),
+            self._submit(exchange_name, exchange.fetch_order_book, pair, limit=5)
+        ]
+        
         try:
-            ticker = exchange.fetch_ticker(pair)
-            order_book = exchange.fetch_order_book(pair, limit=5)
+            _, not_done = await asyncio.wait(calls, timeout=self.exchange_timeout)
+            if not_done:
+                logger.warning(f"Timeout fetching from {exchange_name} after {self.exchange_timeout}s")
+                return None
             
-            return {
-                'type': 'CEX',
-                'exchange': exchange_name,
-                'pair': pair,
-                'price': float(ticker['last']),
-                'bid': float(order_book['bids'][0][0]) if order_book['bids'] else float(ticker['bid']),
-                'ask': float(order_book['asks'][0][0]) if order_book['asks'] else float(ticker['ask']),
-                'volume_24h_usd': float(ticker.get('quoteVolume', 0) * ticker['last']),
-                'liquidity_usd': float(sum(b[1] * b[0] for b in order_book['bids'][:5])),
-                'spread_pct': ((float(order_book['asks'][0][0]) - float(order_book['bids'][0][0])) / float(order_book['bids'][0][0])) * 100 if order_book['bids'] and order_book['asks'] else 0,
-                'timestamp': datetime.utcnow().isoformat()
-            }
+            ticker, order_book = (call.result() for call in calls)
+            
+            return self._build_cex_quote(exchange_name, pair, ticker, order_book)
         except Exception as e:
-            print(f"Error fetching from {exchange_name}: {e}")
+            logger.error(f"Error fetching from {exchange_name}: {e}")
             return None
+        finally:
+            for call in calls:
+                call.cancel()
+    
+    def _build_cex_quote(self, exchange_name: str, pair: str, ticker: Dict, order_book: Dict) -> Dict:
+        """Normalize a CCXT ticker + order book into a CEX source dict"""
+        return {
+            'type': 'CEX',
+            'exchange': exchange_name,
+            'pair': pair,
+            'price': float(ticker['last']),
+            'bid': float(order_book['bids'][0][0]) if order_book['bids'] else float(ticker['bid']),
+            'ask': float(order_book['asks'][0][0]) if order_book['asks'] else float(ticker['ask']),
+            'volume_24h_usd': float(ticker.get('quoteVolume', 0) * ticker['last']),
+            'liquidity_usd': float(sum(b[1] * b[0] for b in order_book['bids'][:5])),
+            'spread_pct': ((float(order_book['asks'][0][0]) - float(order_book['bids'][0][0])) / float(order_book['bids'][0][0])) * 100 if order_book['bids'] and order_book['asks'] else 0,
+            'bids': [[float(p), float(q)] for p, q, *_ in order_book['bids']],
+            'asks': [[float(p), float(q)] for p, q, *_ in order_book['asks']],
+            'timestamp': datetime.utcnow().isoformat()
+        }
+    
+    def _build_ticker_quote(self, exchange_name: str, pair: str, ticker: Dict) -> Dict:
+        """
+        Normalize a bulk-ticker entry into a CEX source dict
+        
+        Bulk tickers carry no book depth, so 24h quote volume stands in
+        for liquidity_usd when weighting these quotes. It is not depth:
+        arbitrage sizing uses bid_size/ask_size instead.
+        """
+        last = float(ticker['last'])
+        bid = float(ticker['bid']) if ticker.get('bid') else None
+        ask = float(ticker['ask']) if ticker.get('ask') else None
+        quote_volume = float(ticker.get('quoteVolume') or 0)
+        
+        return {
+            'type': 'CEX',
+            'exchange': exchange_name,
+            'pair': pair,
+            'price': last,
+            'bid': bid,
+            'ask': ask,
+            # Top-of-book sizes in base units, when the venue reports them
+            'bid_size': float(ticker['bidVolume']) if ticker.get('bidVolume') else None,
+            'ask_size': float(ticker['askVolume']) if ticker.get('askVolume') else None,
+            'volume_24h_usd': quote_volume * last,
+            'liquidity_usd': quote_volume,
+            'spread_pct': ((ask - bid) / bid) * 100 if bid and ask else 0,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+    
+    @staticmethod
+    def _fetch_tickers_blocking(exchange, pairs: List[str]) -> Dict:
+        """One bulk ticker call for the pairs this venue lists"""
+        exchange.load_markets()  # cached by CCXT after the first call
+        symbols = [p for p in pairs if p in exchange.markets]
+        return exchange.fetch_tickers(symbols) if symbols else {}
+    
+    async def _fetch_tickers_from_exchange(self, exchange_name: str, exchange, pairs: List[str]) -> List[Dict]:
+        """
+        Fetch many pairs from one exchange with a single fetch_tickers call
+        """
+        if not self._reserve(exchange_name, 1):
+            logger.warning(f"Skipping {exchange_name} tickers: {self.max_calls_per_venue} calls still running")
+            return []
+        
+        call = self._submit(exchange_name, self._fetch_tickers_blocking, exchange, pairs)
+        
+        try:
+            tickers = await asyncio.wait_for(call, timeout=self.exchange_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timeout fetching tickers from {exchange_name} after {self.exchange_timeout}s")
+            return []
+        except Exception as e:
+            logger.error(f"Error fetching tickers from {exchange_name}: {e}")
+            return []
+        
+        quotes = []
+        for pair in pairs:
+            ticker = tickers.get(pair)
+            if ticker and ticker.get('last'):
+                quotes.append(self._build_ticker_quote(exchange_name, pair, ticker))
+        return quotes
     
     async def get_dex_prices(self, pair: str) -> List[Dict]:
         """
@@ -124,78 +362,40 @@ class MarketAggregator:
     
     def calculate_aggregate_price(self, sources: List[Dict]) -> Dict:
         """
-        Calculate volume-weighted average price and key metrics
-        """
-        # Filter valid sources with minimum liquidity
-        valid_sources = [
-            s for s in sources 
-            if s.get('liquidity_usd', 0) >= 100000 and s.get('price')
-        ]
-        
-        if not valid_sources:
-            return {'error': 'No valid price sources'}
-        
-        # Separate CEX and DEX
-        cex_sources = [s for s in valid_sources if s['type'] == 'CEX']
-        dex_sources = [s for s in valid_sources if s['type'] == 'DEX']
+        Calculate liquidity-weighted average price and key metrics
         
-        # Calculate weighted prices
-        total_liquidity = sum(s['liquidity_usd'] for s in valid_sources)
-        
-        weighted_price = sum(
-            s['price'] * (s['liquidity_usd'] / total_liquidity)
-            for s in valid_sources
-        )
-        
-        # CEX weighted average
-        if cex_sources:
-            cex_liquidity = sum(s['liquidity_usd'] for s in cex_sources)
-            cex_price = sum(
-                s['price'] * (s['liquidity_usd'] / cex_liquidity)
-                for s in cex_sources
-            )
-        else:
-            cex_price = None
-            cex_liquidity = 0
-        
-        # DEX weighted average
-        if dex_sources:
-            dex_liquidity = sum(s['liquidity_usd'] for s in dex_sources)
-            dex_price = sum(
-                s['price'] * (s['liquidity_usd'] / dex_liquidity)
-                for s in dex_sources
-            )
-        else:
-            dex_price = None
-            dex_liquidity = 0
+        Runs the columnar pricing kernel (see services/pricing_kernel.py);
+        depth_vwap is weighted over every book level carried by the sources.
+        """
+        result = aggregate_many(QuoteBatch.from_sources([sources]))
+        aggregate = aggregate_row(result, 0)
         
-        # Best bid/ask
-        best_bid = max(s['bid'] for s in cex_sources) if cex_sources else None
-        best_ask = min(s['ask'] for s in cex_sources) if cex_sources else None
+        if 'error' not in aggregate:
+            aggregate['sources'] = [s for s, ok in zip(sources, result['valid']) if ok]
         
-        return {
-            'weighted_price': round(weighted_price, 2),
-            'best_bid': best_bid,
-            'best_ask': best_ask,
-            'spread_pct': ((best_ask - best_bid) / best_bid * 100) if best_bid and best_ask else None,
-            'cex_price': round(cex_price, 2) if cex_price else None,
-            'dex_price': round(dex_price, 2) if dex_price else None,
-            'cex_liquidity': cex_liquidity,
-            'dex_liquidity': dex_liquidity,
-            'total_liquidity': total_liquidity,
-            'source_count': len(valid_sources),
-            'cex_count': len(cex_sources),
-            'dex_count': len(dex_sources),
-            'sources': valid_sources
-        }
+        return aggregate
     
     async def get_pair_market_data(self, pair: str) -> Dict:
         """
         Main method: Get aggregated market data for a pair
         """
-        # Fetch from CEX and DEX in parallel
-        cex_prices = await self.get_cex_prices(pair)
-        dex_prices = await self.get_dex_prices(pair)
+        # Serve from live books when enough venues are streaming this pair
+        cex_prices = []
+        if self.subscriptions is not None and self.subscriptions.subscribe(pair):
+            streamed = self.get_streamed_sources(pair)
+            if streamed and len(streamed) >= min(self.quorum, len(self.subscriptions.venues)):
+                cex_prices = streamed
+        
+        if cex_prices:
+            cex_feed = 'stream'
+            dex_prices = await self.get_dex_prices(pair)
+        else:
+            # Fetch from CEX and DEX in parallel
+            cex_feed = 'poll'
+            cex_prices, dex_prices = await asyncio.gather(
+                self.get_cex_prices(pair),
+                self.get_dex_prices(pair)
+            )
         
         all_sources = cex_prices + dex_prices
         
@@ -206,6 +406,46 @@ class MarketAggregator:
             'pair': pair,
             'timestamp': datetime.utcnow().isoformat(),
             'aggregate': aggregate,
+            'cex_feed': cex_feed,
             'cex_sources': cex_prices,
             'dex_sources': dex_prices
         }
+    
+    async def get_many_pairs_market_data(self, pairs: List[str]) -> Dict:
+        """
+        Batch method: aggregated market data for many pairs
+        
+        Issues one bulk ticker call per exchange (instead of a ticker and
+        order book call per pair per exchange) and aggregates every pair in
+        a single vectorized pass.
+        """
+        pairs = list(dict.fromkeys(pairs))  # de-duplicate, keep order
+        
+        venue_results, dex_results = await asyncio.gather(
+            asyncio.gather(*[
+                self._fetch_tickers_from_exchange(exchange_name, exchange, pairs)
+                for exchange_name, exchange in self.exchanges.items()
+            ]),
+            asyncio.gather(*[self.get_dex_prices(pair) for pair in pairs])
+        )
+        
+        cex_by_pair = {pair: [] for pair in pairs}
+        for quotes in venue_results:
+            for quote in quotes:
+                cex_by_pair[quote['pair']].append(quote)
+        
+        sources_by_pair = [cex_by_pair[pair] + dex_results[i] for i, pair in enumerate(pairs)]
+        aggregates = aggregate_sources(sources_by_pair)
+        
+        return {
+            'timestamp': datetime.utcnow().isoformat(),
+            'venues_answered': sum(1 for quotes in venue_results if quotes),
+            'pairs': {
+                pair: {
+                    'aggregate': aggregates[i],
+                    'cex_sources': cex_by_pair[pair],
+                    'dex_sources': dex_results[i]
+                }
+                for i, pair in enumerate(pairs)
+            }
+        }
@@ -0,0 +1,115 @@
+# backend/services/ohlcv_reader.py
+"""
+Columnar OHLCV reads
+Fetches only the candle columns a chart needs, cast to float in SQL, as
+NumPy arrays, and pushes window statistics into SQL aggregates
+"""
+
+from typing import Dict, List, Optional
+from datetime import datetime
+from sqlalchemy import Float, cast, func
+from sqlalchemy.orm import Session
+import numpy as np
+
+from models import OHLCV
+
+# Response field -> float column
+PRICE_COLUMNS = {
+    'open': OHLCV.open_price,
+    'high': OHLCV.high_price,
+    'low': OHLCV.low_price,
+    'close': OHLCV.close_price,
+    'volume': OHLCV.volume,
+    'volume_quote': OHLCV.volume_quote,
+}
+
+
+def fetch_candles(db: Session, pair: str, timeframe: str, limit: int) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Latest `limit` candles for pair/timeframe in chronological order
+
+    Returns one array per field (timestamps as datetime64[s], prices and
+    volumes as float64 with NaN for NULL), or None when there are no rows.
+    """
+    rows = db.query(
+        OHLCV.timestamp,
+        *(cast(column, Float) for column in PRICE_COLUMNS.values()),
+        OHLCV.trades_count
+    ).filter(
+        OHLCV.pair == pair,
+        OHLCV.timeframe == timeframe
+    ).order_by(OHLCV.timestamp.desc()).limit(limit).all()
+
+    if not rows:
+        return None
+
+    # Rows arrive newest first; transpose and reverse once
+    timestamps, *values, trades = zip(*reversed(rows))
+    columns = {'timestamp': np.array(timestamps, dtype='datetime64[s]')}
+    for name, column_values in zip(PRICE_COLUMNS, values):
+        columns[name] = np.array(column_values, dtype=np.float64)
+    columns['trades'] = np.array(trades, dtype=object)
+    return columns
+
+
+def _to_list(values: np.ndarray) -> List:
+    """Array -> JSON-safe list (NaN -> None)"""
+    if values.dtype.kind == 'f' and np.isnan(values).any():
+        return np.where(np.isnan(values), None, values).tolist()
+    return values.tolist()
+
+
+def serialize_columns(columns: Dict[str, np.ndarray]) -> Dict[str, List]:
+    """Column layout: {'timestamp': [...], 'open': [...], ...}"""
+    result = {'timestamp': np.datetime_as_string(columns['timestamp'], unit='s').tolist()}
+    for name in PRICE_COLUMNS:
+        result[name] = _to_list(columns[name])
+    result['trades'] = columns['trades'].tolist()
+    return result
+
+
+def serialize_rows(columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """Row layout matching the original /ohlcv response"""
+    data = serialize_columns(columns)
+    keys = list(data)
+    return [dict(zip(keys, row)) for row in zip(*data.values())]
+
+
+def window_stats(db: Session, pair: str, since: datetime) -> Optional[Dict]:
+    """
+    High/low/average close, total volume and first open/last close for a window
+
+    Computed in one SQL statement; returns None when the window is empty.
+    """
+    window = (OHLCV.pair == pair, OHLCV.timestamp >= since)
+    close = cast(OHLCV.close_price, Float)
+
+    first_open = db.query(cast(OHLCV.open_price, Float)).filter(*window) \
+        .order_by(OHLCV.timestamp.asc()).limit(1).scalar_subquery()
+    last_close = db.query(close).filter(*window) \
+        .order_by(OHLCV.timestamp.desc()).limit(1).scalar_subquery()
+
+    row = db.query(
+        func.count(OHLCV.id),
+        func.max(close),
+        func.min(close),
+        func.avg(close),
+        func.sum(cast(OHLCV.volume, Float)),
+        first_open,
+        last_close
+    ).filter(*window).one()
+
+    count, high, low, avg_price, total_volume, open_price, close_price = row
+    if not count:
+        return None
+
+    return {
+        'candles': count,
+        'high': high,
+        'low': low,
+        'open': open_price,
+        'close': close_price,
+        'change_pct': ((close_price - open_price) / open_price) * 100 if open_price else None,
+        'avg_price': avg_price,
+        'total_volume': total_volume or 0.0,
+    }
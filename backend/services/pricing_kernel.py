@@ -0,0 +1,166 @@
+# backend/services/pricing_kernel.py
+"""
+Vectorized aggregate pricing
+Computes liquidity-weighted prices, best bid/ask and depth VWAP for many
+pairs in one pass over a columnar quote batch
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+
+# Sources below this liquidity are ignored (matches MarketAggregator)
+MIN_LIQUIDITY_USD = 100000
+
+
+@dataclass
+class QuoteBatch:
+    """
+    Columnar table of venue quotes for one or more pairs
+
+    Row i is one venue quote for pair `pair_idx[i]`. Missing prices, bids
+    or asks are NaN. Book levels of every row are flattened into the
+    level_* arrays, with `level_row` pointing back at the owning quote row.
+    """
+    n_pairs: int
+    pair_idx: np.ndarray       # intp, per quote
+    price: np.ndarray          # float64, per quote
+    bid: np.ndarray            # float64, per quote
+    ask: np.ndarray            # float64, per quote
+    liquidity: np.ndarray      # float64, per quote
+    is_cex: np.ndarray         # bool, per quote
+    level_row: np.ndarray      # intp, per book level
+    level_price: np.ndarray    # float64, per book level
+    level_amount: np.ndarray   # float64, per book level
+
+    @classmethod
+    def from_sources(cls, sources_by_pair: List[List[Dict]]) -> 'QuoteBatch':
+        """Build a batch from MarketAggregator source dicts, one list per pair"""
+        rows = [(i, s) for i, sources in enumerate(sources_by_pair) for s in sources]
+        n = len(rows)
+
+        def column(getter, dtype=np.float64):
+            return np.fromiter((getter(s) for _, s in rows), dtype=dtype, count=n)
+
+        level_row, level_price, level_amount = [], [], []
+        for row, (_, s) in enumerate(rows):
+            for side in ('bids', 'asks'):
+                for level in s.get(side) or ():
+                    level_row.append(row)
+                    level_price.append(level[0])
+                    level_amount.append(level[1])
+
+        return cls(
+            n_pairs=len(sources_by_pair),
+            pair_idx=np.fromiter((i for i, _ in rows), dtype=np.intp, count=n),
+            price=column(lambda s: s.get('price') or np.nan),
+            bid=column(lambda s: s.get('bid') or np.nan),
+            ask=column(lambda s: s.get('ask') or np.nan),
+            liquidity=column(lambda s: s.get('liquidity_usd') or 0.0),
+            is_cex=column(lambda s: s.get('type') == 'CEX', dtype=bool),
+            level_row=np.asarray(level_row, dtype=np.intp),
+            level_price=np.asarray(level_price, dtype=np.float64),
+            level_amount=np.asarray(level_amount, dtype=np.float64),
+        )
+
+
+def aggregate_many(batch: QuoteBatch, min_liquidity: float = MIN_LIQUIDITY_USD) -> Dict[str, np.ndarray]:
+    """
+    Aggregate every pair of a quote batch
+
+    Returns one array per metric indexed by pair, plus the per-quote
+    `valid` mask of rows that passed the liquidity/price filter.
+    """
+    n_pairs = batch.n_pairs
+    idx = batch.pair_idx
+    price = batch.price
+    liquidity = batch.liquidity
+
+    valid = (liquidity >= min_liquidity) & np.isfinite(price) & (price > 0)
+    cex = valid & batch.is_cex
+    dex = valid & ~batch.is_cex
+
+    weighted = np.where(valid, price * liquidity, 0.0)
+
+    def group_sum(values, mask):
+        return np.bincount(idx[mask], weights=values[mask], minlength=n_pairs)
+
+    total_liquidity = group_sum(liquidity, valid)
+    cex_liquidity = group_sum(liquidity, cex)
+    dex_liquidity = group_sum(liquidity, dex)
+
+    # Depth-weighted VWAP over every book level of the valid quotes
+    level_valid = valid[batch.level_row] if batch.level_row.size else np.zeros(0, dtype=bool)
+    level_pair = idx[batch.level_row[level_valid]]
+    level_amount = batch.level_amount[level_valid]
+    level_notional = batch.level_price[level_valid] * level_amount
+    depth_notional = np.bincount(level_pair, weights=level_notional, minlength=n_pairs)
+    depth_amount = np.bincount(level_pair, weights=level_amount, minlength=n_pairs)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weighted_price = group_sum(weighted, valid) / total_liquidity
+        cex_price = group_sum(weighted, cex) / cex_liquidity
+        dex_price = group_sum(weighted, dex) / dex_liquidity
+        depth_vwap = depth_notional / depth_amount
+
+    # Best bid/ask come from CEX books only
+    best_bid = np.full(n_pairs, np.nan)
+    best_ask = np.full(n_pairs, np.nan)
+    np.fmax.at(best_bid, idx[cex], batch.bid[cex])
+    np.fmin.at(best_ask, idx[cex], batch.ask[cex])
+
+    return {
+        'valid': valid,
+        'weighted_price': weighted_price,
+        'depth_vwap': depth_vwap,
+        'best_bid': best_bid,
+        'best_ask': best_ask,
+        'cex_price': cex_price,
+        'dex_price': dex_price,
+        'cex_liquidity': cex_liquidity,
+        'dex_liquidity': dex_liquidity,
+        'total_liquidity': total_liquidity,
+        'source_count': np.bincount(idx[valid], minlength=n_pairs),
+        'cex_count': np.bincount(idx[cex], minlength=n_pairs),
+        'dex_count': np.bincount(idx[dex], minlength=n_pairs),
+    }
+
+
+def _opt(value) -> Optional[float]:
+    """NaN -> None, numpy scalar -> float"""
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def aggregate_row(result: Dict[str, np.ndarray], i: int) -> Dict:
+    """Format pair i of an aggregate_many result like calculate_aggregate_price"""
+    if result['source_count'][i] == 0:
+        return {'error': 'No valid price sources'}
+
+    best_bid = _opt(result['best_bid'][i])
+    best_ask = _opt(result['best_ask'][i])
+    cex_price = _opt(result['cex_price'][i])
+    dex_price = _opt(result['dex_price'][i])
+    depth_vwap = _opt(result['depth_vwap'][i])
+
+    return {
+        'weighted_price': round(float(result['weighted_price'][i]), 2),
+        'depth_vwap': round(depth_vwap, 2) if depth_vwap else None,
+        'best_bid': best_bid,
+        'best_ask': best_ask,
+        'spread_pct': ((best_ask - best_bid) / best_bid * 100) if best_bid and best_ask else None,
+        'cex_price': round(cex_price, 2) if cex_price else None,
+        'dex_price': round(dex_price, 2) if dex_price else None,
+        'cex_liquidity': float(result['cex_liquidity'][i]),
+        'dex_liquidity': float(result['dex_liquidity'][i]),
+        'total_liquidity': float(result['total_liquidity'][i]),
+        'source_count': int(result['source_count'][i]),
+        'cex_count': int(result['cex_count'][i]),
+        'dex_count': int(result['dex_count'][i]),
+    }
+
+
+def aggregate_sources(sources_by_pair: List[List[Dict]], min_liquidity: float = MIN_LIQUIDITY_USD) -> List[Dict]:
+    """Aggregate source dicts for several pairs at once"""
+    result = aggregate_many(QuoteBatch.from_sources(sources_by_pair), min_liquidity)
+    return [aggregate_row(result, i) for i in range(len(sources_by_pair))]
@@ -0,0 +1,114 @@
+# backend/services/quote_cache.py
+"""
+Tick-level quote cache
+Short-lived (exchange, pair) cache with single-flight request coalescing
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+import asyncio
+import time
+
+
+class QuoteCache:
+    """
+    Cache venue quotes for a short freshness window
+
+    Concurrent lookups for the same key share one in-flight fetch
+    ("single-flight"), so a burst of /search, /detail and /arbitrage calls
+    for the same pair costs one upstream request per venue.
+    """
+
+    def __init__(self, ttl_seconds: float = 1.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh cached value or None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        value, fetched_at = entry
+        if time.monotonic() - fetched_at >= self.ttl_seconds:
+            del self.entries[key]
+            return None
+
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, pruning expired entries when the table is full"""
+        if len(self.entries) >= self.max_entries and key not in self.entries:
+            self.clear_expired()
+            if len(self.entries) >= self.max_entries:
+                # Still full - drop the oldest entry
+                oldest = min(self.entries, key=lambda k: self.entries[k][1])
+                del self.entries[oldest]
+
+        self.entries[key] = (value, time.monotonic())
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for key, or fetch it once for all waiters
+
+        None results are not cached, so a failed venue is retried on the
+        next request. Cancelling one waiter does not cancel the shared fetch.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._fetch(key, fetch))
+            self.in_flight[key] = task
+
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+            if value is not None:
+                self.set(key, value)
+            return value
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight.pop(key, None)
+
+    def clear_expired(self) -> None:
+        """Remove expired entries"""
+        now = time.monotonic()
+        expired = [k for k, (_, fetched_at) in self.entries.items()
+                   if now - fetched_at >= self.ttl_seconds]
+        for k in expired:
+            del self.entries[k]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/coalesce counters"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'hit_ratio': round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            'entries': len(self.entries),
+            'in_flight': len(self.in_flight),
+            'ttl_seconds': self.ttl_seconds
+        }